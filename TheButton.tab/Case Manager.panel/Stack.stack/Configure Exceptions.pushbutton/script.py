@@ -54,6 +54,7 @@ Compatible with IronPython 2.7 and Revit 2024.
 
 import datetime
 import getpass
+import io
 import json
 import os
 import shutil
@@ -87,6 +88,8 @@ PROJECT_DIR  = os.path.dirname(PROJECT_JSON)
 MODEL_NAME   = os.path.splitext(os.path.basename(PROJECT_JSON))[0].replace("_exceptions", "")
 USER         = getpass.getuser()
 VERSION      = "1.7.2"
+DEBUG_JSON   = False              # True → indented, human-readable project JSON
+WRITE_BUFFER = 64 * 1024
 
 # initialise logger (shared with other scripts in the extension) -------------
 logger = get_logger("ExceptionsManager", filename_override="ExceptionsManager")
@@ -96,14 +99,19 @@ SRC    = "ManageExUI"
 # Utility helpers
 # ---------------------------------------------------------------------------
 
+_DISK_BYTES = {}  # path → bytes last read from / written to disk
+
+
 def _load_json(path):
     """Return ``list`` loaded from *path* or an empty list on failure."""
     try:
-        with open(path, "r") as fp:
-            data = json.load(fp)
-            if isinstance(data, list):
-                return data
-            raise ValueError("JSON root node is not a list")
+        with io.open(path, "rb") as fp:
+            raw = fp.read()
+        _DISK_BYTES[path] = raw
+        data = json.loads(raw.decode("utf-8"))
+        if isinstance(data, list):
+            return data
+        raise ValueError("JSON root node is not a list")
     except Exception as exc:  # noqa: B902 – broad on purpose, UI feedback required
         logger.error("load_failed path=%s error=%s", path, exc, extra={"src": SRC, "version": VERSION, "user": USER})
         MessageBox.Show(
@@ -126,14 +134,23 @@ def _save_json(path, flat_list, log_msg=None):
     """Write *flat_list* to *path* atomically and log *log_msg* if given."""
     try:
         tmp_path = path + ".tmp"
-        with open(tmp_path, "w") as tmp_fp:
-            json.dump(flat_list, tmp_fp, indent=2)
+        if DEBUG_JSON:
+            payload = json.dumps(flat_list, indent=2, ensure_ascii=False)
+        else:
+            payload = json.dumps(flat_list, separators=(",", ":"), ensure_ascii=False)
+        data = payload.encode("utf-8")
+
+        if _DISK_BYTES.get(path) == data:
+            logger.info("no_change path=%s", path, extra={"src": SRC, "version": VERSION, "user": USER})
+            return
+
+        with io.open(tmp_path, "wb", buffering=WRITE_BUFFER) as tmp_fp:
+            tmp_fp.write(data)
         _atomic_replace(tmp_path, path)
+        _DISK_BYTES[path] = data
 
         if log_msg:
             logger.info(log_msg, extra={"src": SRC, "version": VERSION, "user": USER})
-            for handler in logger.handlers:
-                handler.flush()
 
     except Exception as exc:  # noqa: B902 – broad on purpose
         logger.error("save_failed path=%s error=%s", path, exc, extra={"src": SRC, "version": VERSION, "user": USER})
@@ -165,6 +182,10 @@ def manage_exceptions():
             break  # Exit selected or dialog cancelled
 
         flat_list = _load_json(PROJECT_JSON)
+        lower_set = {e.lower() for e in flat_list}
+        index_of  = {}                      # value → first position, built once
+        for pos, value in enumerate(flat_list):
+            index_of.setdefault(value, pos)
         action = actions[choice]
 
         # ------------------------------------------------------------------
@@ -175,7 +196,7 @@ def manage_exceptions():
             if not new_exc:
                 continue
 
-            if any(e.lower() == new_exc.lower() for e in flat_list):
+            if new_exc.lower() in lower_set:
                 MessageBox.Show("\"{0}\" already exists.".format(new_exc), title, MessageBoxButtons.OK)
                 continue
 
@@ -194,16 +215,18 @@ def manage_exceptions():
             old_val = forms.SelectFromList.show(flat_list, "Select exception to edit", multiselect=False)
             if old_val is None:
                 continue
+            old_idx = index_of[old_val]
 
             new_val = forms.ask_for_string("Enter new value:", old_val)
             if not new_val:
                 continue
 
-            if any(e.lower() == new_val.lower() and e.lower() != old_val.lower() for e in flat_list):
+            new_low = new_val.lower()
+            if new_low in lower_set and new_low != old_val.lower():
                 MessageBox.Show("That exception already exists.", title, MessageBoxButtons.OK)
                 continue
 
-            flat_list[flat_list.index(old_val)] = new_val
+            flat_list[old_idx] = new_val
             _save_json(PROJECT_JSON, flat_list, log_msg='edit old="{0}" new="{1}"'.format(old_val, new_val))
             ExceptionManager.clear_cache()
 
@@ -223,7 +246,7 @@ def manage_exceptions():
             if confirm != DialogResult.Yes:
                 continue
 
-            flat_list.remove(to_delete)
+            del flat_list[index_of[to_delete]]
             _save_json(PROJECT_JSON, flat_list, log_msg='delete value="{0}"'.format(to_delete))
             ExceptionManager.clear_cache()
 
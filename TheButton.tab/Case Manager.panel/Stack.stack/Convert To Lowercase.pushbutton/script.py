@@ -39,7 +39,7 @@ Key features
     • quantities like “4No.” (no extra spaces)
     • typographic apostrophes for five key possessives.
 * Skips text notes inside model groups.
-* Writes a rotating per-user / per-model log (token-level diff).
+* Writes a rotating per-user / per-model log (token-level changes).
 * IronPython 2.7 -- Revit 2024 compatible.
 """
 from Autodesk.Revit.DB import *
@@ -54,9 +54,9 @@ doc    = __revit__.ActiveUIDocument.Document #type:Document
 import os
 import sys
 import re
-import difflib
-import atexit
 import clr
+import logging
+from collections import defaultdict
 
 # -----------------------------------------------------------------------------
 # .NET / pyRevit imports
@@ -100,17 +100,12 @@ try:
 except Exception:
     MODEL_NAME = 'unsaved_doc'
 
-# Flush logs on exit
-atexit.register(lambda: [h.flush() for h in LOGGER.handlers])
-
 # -----------------------------------------------------------------------------
 # Exception manager
 # -----------------------------------------------------------------------------
 import exception_manager as EM
 from exception_manager import ExceptionManager
 
-REGEX_MAP = ExceptionManager.get_single_regexps()
-
 # -----------------------------------------------------------------------------
 # Sentence segmentation helpers
 # -----------------------------------------------------------------------------
@@ -129,13 +124,19 @@ SENT_END = re.compile(
 
 NO_SENTENCE_DOT  = [u'u.n.o.', u't.b.c.']
 _ABBR_SAFE_DOT   = u'\uFE52'                         # small Unicode dot
+_PROTECT_ABBR_RE = re.compile(
+    r'(?i)\b(?:' + '|'.join(re.escape(abbr) for abbr in NO_SENTENCE_DOT) + r')\b'
+)
 
 # -----------------------------------------------------------------------------
 # Inline heuristics
 # -----------------------------------------------------------------------------
+_BULLET_RE = re.compile(r'^\s*(?:\d+\.\s+|[-*•]\s+)')
+
+
 def is_bulleted_or_numbered_line(line):
     """Return *True* for a leading digit+dot or bullet character."""
-    return bool(re.match(r'^\s*(?:\d+\.\s+|[-*•]\s+)', line))
+    return bool(_BULLET_RE.match(line))
 
 
 def split_into_sentences(text):
@@ -153,32 +154,21 @@ def split_into_sentences(text):
     return out
 
 
-def apply_strict_sentence_case(line):
-    """Lower-case the sentence then title-case the first alphabetical token."""
-    segments   = split_into_sentences(line)
-    out_chunks = []
+# First character of the first whitespace-delimited token holding a letter
+_FIRST_WORD_RE = re.compile(r'(?<!\S)(?=\S*[A-Za-z])\S')
 
-    for seg_text, delim in segments:
-        tokens, found_alpha = re.split(r'(\s+)', seg_text), False
-        new_tokens = []
 
-        for tok in tokens:
-            if not found_alpha and re.search(r'[A-Za-z]', tok):
-                tok, found_alpha = tok[:1].upper() + tok[1:].lower(), True
-            else:
-                tok = tok.lower()
-            new_tokens.append(tok)
-
-        out_chunks.append(''.join(new_tokens) + delim)
-    return ''.join(out_chunks)
+def apply_strict_sentence_case(line):
+    """Lower-case the sentence then title-case the first alphabetical token."""
+    return ''.join(
+        _FIRST_WORD_RE.sub(lambda m: m.group(0).upper(), seg_text.lower(), count=1) + delim
+        for seg_text, delim in split_into_sentences(line)
+    )
 
 
 def protect_abbrev(text):
     """Swap dots in dotted abbreviations for the safe dot so they survive split."""
-    for abbr in NO_SENTENCE_DOT:
-        pattern = re.compile(r'(?i)\b' + re.escape(abbr) + r'\b')
-        text    = pattern.sub(lambda m: m.group(0).replace('.', _ABBR_SAFE_DOT), text)
-    return text
+    return _PROTECT_ABBR_RE.sub(lambda m: m.group(0).replace('.', _ABBR_SAFE_DOT), text)
 
 
 def restore_abbrev(text):
@@ -244,36 +234,46 @@ def normalise_profile(token):
     return (pre + lit + suf).replace('X', 'x')
 
 
+_SUPERSCRIPTS = {'2': u'²', '3': u'³'}
+_SUBSCRIPT_RE = re.compile(r'(\d)m([23])\b|\b(mm|m)([23])\b', re.I)
+
+
+def _superscript_repl(match):
+    digit, exp, unit, unit_exp = match.groups()
+    if digit is not None:                         # 20m2 → 20m²
+        return digit + 'm' + _SUPERSCRIPTS[exp]
+    return unit.lower() + _SUPERSCRIPTS[unit_exp]  # mm2 → mm²
+
+
 def convert_subscripts(text):
     """Replace 2/3 exponents in m, mm tokens with proper superscripts."""
-    text = re.sub(
-        r'(\d)(m)([23])\b',
-        lambda m: m.group(1) + 'm' + (u'²' if m.group(3) == '2' else u'³'),
-        text,
-        flags=re.I,
-    )
-    for k, v in {'mm2': 'mm²', 'mm3': 'mm³', 'm2': 'm²', 'm3': 'm³'}.items():
-        text = re.sub(r'(?i)\b' + k + r'\b', v, text)
-    return text
+    return _SUBSCRIPT_RE.sub(_superscript_repl, text)
+
+
+_BS_RE = re.compile(r'\bbs\b', re.I)
+_EN_RE = re.compile(r'\ben\b', re.I)
 
 
 def restore_literals(line):
-    """Apply every replacement regex from *REGEX_MAP* then hard-code BS / EN."""
-    for rx, canon in REGEX_MAP.items():
-        line = rx.sub(canon, line)
-    line = re.sub(r'\bbs\b', 'BS', line, flags=re.I)
-    line = re.sub(r'\ben\b', 'EN', line, flags=re.I)
+    """Restore exception literals via ExceptionManager.apply, then hard-code BS / EN."""
+    line = ExceptionManager.apply(line)
+    line = _BS_RE.sub('BS', line)
+    line = _EN_RE.sub('EN', line)
     return line
 
 # -----------------------------------------------------------------------------
 # Core “enforcer” for word tokens
 # -----------------------------------------------------------------------------
+_HAS_DIGIT         = frozenset('0123456789')
+_ENFORCE_CACHE_MAX = 8192                        # distinct tokens memoised per applier
+
 class ExceptionApplier(object):
     """Apply all exception rules to individual word tokens."""
 
     def __init__(self):
         data          = EM.ExceptionManager.load_all()
         self.literals = {p for items in data.values() for p in items if ' ' not in p}
+        self._literal_lc = {l.lower(): l for l in self.literals}
 
         # Unit canonical map
         self.unit_map = {
@@ -297,12 +297,28 @@ class ExceptionApplier(object):
         }
         # Also accept the curly apostrophe input
         self.apostrophe_map.update({k.replace("'", u"’"): v for k, v in self.apostrophe_map.items()})
+        self._apos_patterns = [
+            (re.compile(r'\b' + re.escape(raw) + r'\b', re.I), canon)
+            for raw, canon in self.apostrophe_map.items()
+        ]
 
         # Section-profile literals and misc
         codes                = data.get('Section Profiles & Steel Sections', [])
         self.sec_codes       = {c.lower(): c for c in codes}
         self.single_letter_codes = {'t', 'd'}
 
+        # Bucket codes by first / last char so a token only checks candidates
+        # that can match; the index keeps the original precedence.
+        self._sec_by_first   = defaultdict(list)
+        self._sec_by_last    = defaultdict(list)
+        for idx, (lc, rc) in enumerate(self.sec_codes.items()):
+            if lc:
+                self._sec_by_first[lc[0]].append((idx, lc, rc))
+                self._sec_by_last[lc[-1]].append((idx, lc, rc))
+
+        # enforce() is pure per token – memoise repeats ("mm", "concrete", …)
+        self._enforce_cache = {}
+
         # Detect surrounding punctuation
         self.bracket_pat = re.compile(
             r'^(?P<open>[\(\[]?)'
@@ -319,12 +335,33 @@ class ExceptionApplier(object):
         Return *token* after applying every domain rule.
         The surrounding punctuation / brackets are preserved verbatim.
         """
-        token_conv = convert_subscripts(token)
+        cached = self._enforce_cache.get(token)
+        if cached is not None:
+            return cached
+
+        result = self._enforce_token(token)
+        if len(self._enforce_cache) < _ENFORCE_CACHE_MAX:
+            self._enforce_cache[token] = result
+        return result
 
-        # Try *whole-token* steel-profile first (fast-exit)
-        prof = normalise_profile(token_conv)
-        if prof:
-            return prof
+    # ---------------------------------------------------------------------
+    # Internal helpers
+    # ---------------------------------------------------------------------
+    def _enforce_token(self, token):
+        """Uncached body of :meth:`enforce`."""
+        if not token.lstrip('0123456789.'):          # pure number – nothing to do
+            return token
+
+        if _HAS_DIGIT.isdisjoint(token):
+            # Superscripts and steel profiles both need a digit – skip them
+            token_conv = token
+        else:
+            token_conv = convert_subscripts(token)
+
+            # Try *whole-token* steel-profile first (fast-exit)
+            prof = normalise_profile(token_conv)
+            if prof:
+                return prof
 
         match = self.bracket_pat.match(token_conv)
         if not match:                                 # no brackets
@@ -340,13 +377,19 @@ class ExceptionApplier(object):
         enforced = self._enforce_core(core)
         return open_ + enforced + close + punct
 
-    # ---------------------------------------------------------------------
-    # Internal helpers
-    # ---------------------------------------------------------------------
     def _enforce_core(self, tok):
         """Apply rules to the word *without* punctuation context."""
         tok_low = tok.lower()
 
+        # Plain word that no rule below can touch (fast-exit)
+        if (_HAS_DIGIT.isdisjoint(tok)
+                and tok_low not in self.unit_map
+                and tok_low not in self.apostrophe_map
+                and tok_low not in self._literal_lc
+                and tok_low[:1] not in self._sec_by_first
+                and tok_low[-1:] not in self._sec_by_last):
+            return tok
+
         # Unit after number (20kN → 20kN, 8.4kN/m² → same canonical form)
         num_unit = self.numeric_re.match(tok)
         if num_unit:
@@ -365,11 +408,13 @@ class ExceptionApplier(object):
             return self.apostrophe_map[tok_low]
 
         # Literal (single-word) overrides
-        if tok_low in {l.lower() for l in self.literals}:
-            return next(l for l in self.literals if l.lower() == tok_low)
+        if tok_low in self._literal_lc:
+            return self._literal_lc[tok_low]
 
         # Section profiles embedded at either end (e.g. “75x75EA”)
-        for lc, rc in self.sec_codes.items():
+        candidates = (self._sec_by_first.get(tok_low[:1], []) +
+                      self._sec_by_last.get(tok_low[-1:], []))
+        for _, lc, rc in sorted(candidates):
             if tok_low.startswith(lc):
                 return rc + tok[len(lc):]
             if tok_low.endswith(lc):
@@ -381,11 +426,25 @@ class ExceptionApplier(object):
     # ---------------------------------------------------------------------
     def apply_apostrophe_exceptions(self, text):
         """One final pass to ensure curly apostrophes are in place."""
-        for raw, canon in self.apostrophe_map.items():
-            text = re.sub(r'\b' + re.escape(raw) + r'\b', canon, text, flags=re.I)
+        for pattern, canon in self._apos_patterns:
+            text = pattern.sub(canon, text)
         return text
 
 
+_APPLIER_SINGLETON = None
+_APPLIER_VERSION   = None
+
+
+def _get_applier():
+    """Return the shared :class:`ExceptionApplier`, rebuilt after a cache clear."""
+    global _APPLIER_SINGLETON, _APPLIER_VERSION
+    version = ExceptionManager.cache_version()
+    if _APPLIER_SINGLETON is None or _APPLIER_VERSION != version:
+        _APPLIER_SINGLETON = ExceptionApplier()
+        _APPLIER_VERSION   = version
+    return _APPLIER_SINGLETON
+
+
 # -----------------------------------------------------------------------------
 # Note-level processing
 # -----------------------------------------------------------------------------
@@ -395,7 +454,8 @@ def convert_text_note_text(text, applier):
     out_lines, changes = [], []
 
     for line in text.splitlines(True):
-        if is_bulleted_or_numbered_line(line):
+        # Blank / letter-free lines (spacers, number columns) cannot change
+        if line.lower() == line.upper() or is_bulleted_or_numbered_line(line):
             out_lines.append(line)
             continue
 
@@ -404,14 +464,17 @@ def convert_text_note_text(text, applier):
 
         orig_toks = tokenize_with_punct(line)
         sent_toks = tokenize_with_punct(sent)
+        n_orig    = len(orig_toks)
 
-        for (io, old), (iw, new) in zip(orig_toks, sent_toks):
-            if io and iw and old != new:
-                changes.append((old, new))
-
+        # One pass: record case changes against the original tokens while
+        # enforcing the exception rules on the sentence-cased ones.
         rebuilt = []
-        for is_word, tok in sent_toks:
+        for idx, (is_word, tok) in enumerate(sent_toks):
             if is_word:
+                if idx < n_orig:
+                    was_word, old = orig_toks[idx]
+                    if was_word and old != tok:
+                        changes.append((old, tok))
                 new_tok = applier.enforce(tok)
                 if new_tok != tok:
                     changes.append((tok, new_tok))
@@ -429,23 +492,31 @@ def convert_text_note_text(text, applier):
 # -----------------------------------------------------------------------------
 def update_text_notes_to_sentence_case(doc):
     """Main entry: run over every TextNote in the model."""
-    notes = (FilteredElementCollector(doc)
-             .OfCategory(BuiltInCategory.OST_TextNotes)
-             .WhereElementIsNotElementType()
-             .ToElements())
-
-    applier = ExceptionApplier()
+    # Ids only – elements are fetched one at a time below. The collector itself
+    # cannot be iterated live because editing note.Text invalidates it.
+    note_ids = (FilteredElementCollector(doc)
+                .OfCategory(BuiltInCategory.OST_TextNotes)
+                .WhereElementIsNotElementType()
+                .ToElementIds())
+
+    applier = _get_applier()
     updated = skipped = total_changes = 0
 
     txn = Transaction(doc, 'Change Register: Sentence-case')
     txn.Start()
     try:
-        for note in notes:
+        for note_id in note_ids:
+            note = doc.GetElement(note_id)
             if note.GroupId != ElementId.InvalidElementId:
                 skipped += 1
                 continue
 
             old_text = note.Text
+
+            # No cased characters (dimensions, level tags, "---") → nothing to do
+            if old_text.lower() == old_text.upper():
+                continue
+
             new_text, changes = convert_text_note_text(old_text, applier)
             new_text = applier.apply_apostrophe_exceptions(new_text)
 
@@ -455,14 +526,16 @@ def update_text_notes_to_sentence_case(doc):
 
                 if changes:
                     total_changes += len(changes)
-                    pairs = ['%s>%s' % (o, c) for o, c in changes]
-                    LOGGER.info('note_id=%s changes=%s', note.Id.IntegerValue, ','.join(pairs))
+                    if LOGGER.isEnabledFor(logging.INFO):
+                        pairs = ['%s>%s' % (o, c) for o, c in changes]
+                        LOGGER.info('note_id=%s changes=%s', note.Id.IntegerValue, ','.join(pairs))
+                elif old_text.split() == new_text.split():
+                    LOGGER.info('note_id=%s whitespace_only_change old_len=%d new_len=%d',
+                                note.Id.IntegerValue, len(old_text), len(new_text))
                 else:
-                    for diff_line in difflib.unified_diff(
-                            old_text.splitlines(),
-                            new_text.splitlines(),
-                            fromfile='old', tofile='new', lineterm=''):
-                        LOGGER.info('note_id=%s diff: %s', note.Id.IntegerValue, diff_line)
+                    # e.g. a possessive restored by apply_apostrophe_exceptions
+                    LOGGER.info('note_id=%s untracked_change old_len=%d new_len=%d',
+                                note.Id.IntegerValue, len(old_text), len(new_text))
 
         txn.Commit()
         LOGGER.info('completed run', extra={'note_cnt': updated,
@@ -23,13 +23,29 @@ import clr
 import sys
 import os
 import re
+import io
+import json
+import tempfile
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Simple console logger
 # ─────────────────────────────────────────────────────────────────────────────
+DEBUG = False  # True → verbose layout / per-paragraph diagnostics
+
+
+_LOG_BUFFER = []  # console lines, written in one go by flush_log()
+
+
 def log(msg):
-    sys.stdout.write(u"{0}\n".format(msg))
+    _LOG_BUFFER.append(u"{0}\n".format(msg))
+
+
+def flush_log():
+    """Write all buffered log lines to the console in a single call."""
+    if _LOG_BUFFER:
+        sys.stdout.write(u"".join(_LOG_BUFFER))
+        del _LOG_BUFFER[:]
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -37,105 +53,349 @@ def log(msg):
 # ─────────────────────────────────────────────────────────────────────────────
 clr.AddReference('Microsoft.Office.Interop.Excel')
 import Microsoft.Office.Interop.Excel as Excel
-from System import Type, Activator, Array
+from System import GC
 from System.Runtime.InteropServices import Marshal
-import System.Reflection
+try:
+    clr.AddReference('office')
+    from Microsoft.Office.Core import MsoAutomationSecurity
+    FORCE_DISABLE_MACROS = MsoAutomationSecurity.msoAutomationSecurityForceDisable
+except Exception:  # Office core PIA missing – macros are then only kept off by EnableEvents
+    FORCE_DISABLE_MACROS = None
+clr.AddReference('System.IO.Compression')
+clr.AddReference('System.IO.Compression.FileSystem')
+clr.AddReference('System.Xml')
+from System.IO.Compression import ZipFile
+from System.Xml import XmlDocument, XmlNamespaceManager, XmlNodeType, XmlReader
+
+
+# Tabs that are never read: the splash screen and any "_"-prefixed helper tab
+SKIP_SHEET_NAMES = ('Splash Screen',)
+SKIP_SHEET_PREFIX = '_'
+
+
+def _is_skipped_sheet(sheet_name):
+    """True for the Splash Screen and helper tabs, which are never read."""
+    return sheet_name in SKIP_SHEET_NAMES or sheet_name.startswith(SKIP_SHEET_PREFIX)
+
+
+def _add_worksheet(worksheets_data, sheet_name, h1_value, j3_value):
+    """Append the tab if H1 is 'Yes' and J3 has content, logging the outcome."""
+    # Check H1 cell
+    if h1_value != 'Yes':
+        log(u"⏭️  Skipping '{0}' tab (H1 = {1})".format(sheet_name, h1_value))
+        return
+
+    # Read J3 cell content
+    if j3_value:
+        worksheets_data.append({
+            'title': sheet_name,
+            # Text cells already arrive as strings; only numbers / booleans need converting
+            'content': j3_value if isinstance(j3_value, unicode) else unicode(j3_value)
+        })
+        log(u"✅  Added '{0}' tab for processing".format(sheet_name))
+    else:
+        log(u"⚠️  '{0}' tab has empty J3 cell".format(sheet_name))
+
+
+def _block_value(block, row, col):
+    """Return cell (*row*, *col*) of a 1-based Value2 array, or None if absent."""
+    if block is None:
+        return None
+    try:
+        return block.GetValue(row, col)
+    except Exception:
+        return None
+
+
+# Parsed tabs of the last workbook read, reused while its mtime is unchanged
+WORKSHEET_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'gennotes_cache.json')
+
+
+def _load_cached_worksheets(path):
+    """Return cached worksheet data for *path*, or None if missing / stale."""
+    try:
+        with io.open(WORKSHEET_CACHE_PATH, 'rb') as fp:
+            cache = json.loads(fp.read().decode('utf-8'))
+        if cache.get('path') == path and cache.get('mtime') == os.path.getmtime(path):
+            return cache.get('worksheets') or None
+    except Exception:
+        pass
+    return None
+
+
+def _save_cached_worksheets(path, worksheets_data):
+    """Store *worksheets_data* for *path*; failures only cost the next run."""
+    try:
+        payload = json.dumps({'path': path,
+                              'mtime': os.path.getmtime(path),
+                              'worksheets': worksheets_data}, ensure_ascii=False)
+        with io.open(WORKSHEET_CACHE_PATH, 'wb') as fp:
+            fp.write(payload.encode('utf-8'))
+    except Exception as ex:
+        log(u"⚠️  Could not write worksheet cache: {0}".format(ex))
 
 
 def read_excel_worksheets(path):
+    """Read all worksheets and their data, reusing the cache if the file is unchanged."""
+    cached = _load_cached_worksheets(path)
+    if cached is not None:
+        log(u"♻️  Workbook unchanged since last run – using cached data: {0}".format(path))
+        return cached
+
+    try:
+        worksheets_data = _read_excel_worksheets_xml(path)
+    except Exception as ex:
+        log(u"⚠️  Direct workbook read failed ({0}) – falling back to Excel".format(ex))
+        worksheets_data = _read_excel_worksheets_com(path)
+    if worksheets_data:
+        _save_cached_worksheets(path, worksheets_data)
+    return worksheets_data
+
+
+# .xlsm is an OpenXML zip package; H1 / J3 can be read without starting Excel
+_XLSX_NS = {
+    'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'p': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+
+
+def _zip_xml(archive, member):
+    """Load *member* of an open ZipArchive as (XmlDocument, namespaces), or (None, None)."""
+    entry = archive.GetEntry(member)
+    if entry is None:
+        return None, None
+    stream = entry.Open()
+    try:
+        xml = XmlDocument()
+        xml.Load(stream)
+    finally:
+        stream.Dispose()
+    return xml, _ns_manager(xml)
+
+
+def _ns_manager(xml):
+    """Namespace manager with the x / r / p prefixes for XPath on *xml*."""
+    nsm = XmlNamespaceManager(xml.NameTable)
+    for prefix, uri in _XLSX_NS.items():
+        nsm.AddNamespace(prefix, uri)
+    return nsm
+
+
+def _xlsx_shared_strings(archive):
+    """Return the shared-string table (index → text)."""
+    xml, nsm = _zip_xml(archive, 'xl/sharedStrings.xml')
+    if xml is None:
+        return []
+    return [u''.join(t.InnerText for t in si.SelectNodes('x:t | x:r/x:t', nsm))
+            for si in xml.SelectNodes('/x:sst/x:si', nsm)]
+
+
+def _xlsx_sheet_parts(archive):
+    """Return [(sheet name, zip member)] for every worksheet, in tab order."""
+    rels, rels_nsm = _zip_xml(archive, 'xl/_rels/workbook.xml.rels')
+    targets = {}
+    for rel in rels.SelectNodes('/p:Relationships/p:Relationship', rels_nsm):
+        target = rel.GetAttribute('Target')
+        targets[rel.GetAttribute('Id')] = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+
+    book, nsm = _zip_xml(archive, 'xl/workbook.xml')
+    parts = []
+    for sheet in book.SelectNodes('/x:workbook/x:sheets/x:sheet', nsm):
+        part = targets.get(sheet.GetAttribute('id', _XLSX_NS['r']))
+        if part and part.startswith('xl/worksheets/'):  # chart sheets are not Worksheets
+            parts.append((sheet.GetAttribute('name'), part))
+    return parts
+
+
+_XLSX_TARGETS = {(1, 8): 'H1', (3, 10): 'J3'}   # (row, column) → cell name
+
+
+def _xlsx_cell_pos(ref):
+    """Split an A1-style reference into 1-based (row, column)."""
+    col = 0
+    for i, ch in enumerate(ref):
+        if ch.isdigit():
+            return int(ref[i:]), col
+        col = col * 26 + ord(ch.upper()) - 64
+    raise ValueError(u"bad cell reference {0}".format(ref))
+
+
+def _xlsx_h1_j3(archive, part, shared):
+    """Stream worksheet *part* only as far as needed and return (H1, J3).
+
+    ``r`` is optional on <row> / <c>; without it the position follows the
+    previous row / cell, as the OpenXML spec defines.
+    """
+    entry = archive.GetEntry(part)
+    if entry is None:
+        raise IOError(u"missing worksheet part {0}".format(part))
+
+    holder = XmlDocument()  # owner for the few <c> nodes that are materialised
+    nsm = _ns_manager(holder)
+    values = {}
+    row = col = 0
+    stream = entry.Open()
+    try:
+        reader = XmlReader.Create(stream)
+        reader.Read()
+        while not reader.EOF:
+            if reader.NodeType == XmlNodeType.Element and reader.NamespaceURI == _XLSX_NS['x']:
+                if reader.LocalName == 'row':
+                    r = reader.GetAttribute('r')
+                    row = int(r) if r else row + 1
+                    col = 0
+                    # Past row 1 without H1 = 'Yes', or past row 3: nothing left to read
+                    if (row > 1 and values.get('H1') != 'Yes') or row > 3:
+                        break
+                elif reader.LocalName == 'c':
+                    r = reader.GetAttribute('r')
+                    if r:
+                        row, col = _xlsx_cell_pos(r)
+                    else:
+                        col += 1
+                    ref = _XLSX_TARGETS.get((row, col))
+                    if ref is not None:
+                        values[ref] = _xlsx_cell_value(holder.ReadNode(reader), nsm, shared)
+                        if ref == 'J3' or values[ref] != 'Yes':
+                            break
+                        continue  # ReadNode already moved past the cell
+            reader.Read()
+        reader.Close()
+    finally:
+        stream.Dispose()
+    return values.get('H1'), values.get('J3')
+
+
+def _xlsx_cell_value(cell, nsm, shared):
+    """Return a <c> node's value the way Range.Value2 would (numbers as float), or None."""
+    kind = cell.GetAttribute('t') or 'n'
+    if kind == 'inlineStr':
+        return u''.join(t.InnerText for t in cell.SelectNodes('x:is/x:t | x:is/x:r/x:t', nsm))
+    value = cell.SelectSingleNode('x:v', nsm)
+    if value is None:
+        return None
+    raw = value.InnerText
+    if kind == 's':
+        return shared[int(raw)]
+    if kind == 'b':
+        return raw == '1'
+    if kind == 'n':
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw  # 'str' (cached formula result) / 'e'
+
+
+def _read_excel_worksheets_xml(path):
+    """Read all worksheets and their data straight from the .xlsm package."""
+    log(u"📂  Reading workbook package: {0}".format(path))
+
+    worksheets_data = []
+    archive = ZipFile.OpenRead(path)
+    try:
+        shared = _xlsx_shared_strings(archive)
+        for sheet_name, part in _xlsx_sheet_parts(archive):
+            if _is_skipped_sheet(sheet_name):
+                log(u"⏭️  Skipping '{0}' tab".format(sheet_name))
+                continue
+
+            h1_value, j3_value = _xlsx_h1_j3(archive, part, shared)
+            _add_worksheet(worksheets_data, sheet_name, h1_value, j3_value)
+    finally:
+        archive.Dispose()
+
+    return worksheets_data
+
+
+def _release_com(obj, final=False):
+    """Release a COM wrapper (None-safe); *final* drops every reference count."""
+    if obj is None:
+        return
+    try:
+        if final:
+            Marshal.FinalReleaseComObject(obj)
+        else:
+            Marshal.ReleaseComObject(obj)
+    except Exception:
+        pass
+
+
+def _read_excel_worksheets_com(path):
     """Read all worksheets and their data from Excel."""
     log(u"📂  Opening Excel workbook: {0}".format(path))
 
     app = None
+    workbooks = None
     wb = None
+    worksheets = None
     worksheets_data = []
 
     try:
-        # Create Excel application using COM
-        excel_type = Type.GetTypeFromProgID("Excel.Application")
-        app = Activator.CreateInstance(excel_type)
-
-        # Set properties using reflection for COM objects
-        app.GetType().InvokeMember("Visible",
-                                   System.Reflection.BindingFlags.SetProperty,
-                                   None, app, Array[object]([False]))
-        app.GetType().InvokeMember("DisplayAlerts",
-                                   System.Reflection.BindingFlags.SetProperty,
-                                   None, app, Array[object]([False]))
-
-        # Get Workbooks collection and open file
-        workbooks = app.GetType().InvokeMember("Workbooks",
-                                               System.Reflection.BindingFlags.GetProperty,
-                                               None, app, None)
-        wb = workbooks.GetType().InvokeMember("Open",
-                                              System.Reflection.BindingFlags.InvokeMethod,
-                                              None, workbooks, Array[object]([path]))
+        # Create Excel application through the interop assembly (bound calls, no reflection)
+        app = Excel.ApplicationClass()
+        app.Visible = False
+        app.DisplayAlerts = False
+        app.ScreenUpdating = False
+        # No workbook events / macros / link prompts – only two cell values are read
+        app.EnableEvents = False
+        app.AskToUpdateLinks = False
+        if FORCE_DISABLE_MACROS is not None:
+            app.AutomationSecurity = FORCE_DISABLE_MACROS
+
+        # Get Workbooks collection and open file read-only (Filename, UpdateLinks, ReadOnly)
+        workbooks = app.Workbooks
+        wb = workbooks.Open(path, 0, True)
 
         # Get Worksheets collection
-        worksheets = wb.GetType().InvokeMember("Worksheets",
-                                               System.Reflection.BindingFlags.GetProperty,
-                                               None, wb, None)
-        count = worksheets.GetType().InvokeMember("Count",
-                                                  System.Reflection.BindingFlags.GetProperty,
-                                                  None, worksheets, None)
+        worksheets = wb.Worksheets
+        count = worksheets.Count
 
         for i in range(1, count + 1):
-            ws = worksheets.GetType().InvokeMember("Item",
-                                                   System.Reflection.BindingFlags.GetProperty,
-                                                   None, worksheets, Array[object]([i]))
-            sheet_name = ws.GetType().InvokeMember("Name",
-                                                   System.Reflection.BindingFlags.GetProperty,
-                                                   None, ws, None)
-
-            # Skip Splash Screen tab
-            if sheet_name == 'Splash Screen':
-                log(u"⏭️  Skipping '{0}' tab".format(sheet_name))
-                continue
+            ws = worksheets.Item[i]
+            block_range = None
+            try:
+                sheet_name = ws.Name
 
-            # Check H1 cell
-            h1_range = ws.GetType().InvokeMember("Range",
-                                                 System.Reflection.BindingFlags.GetProperty,
-                                                 None, ws, Array[object](["H1"]))
-            h1_value = h1_range.GetType().InvokeMember("Value2",
-                                                       System.Reflection.BindingFlags.GetProperty,
-                                                       None, h1_range, None)
-            if h1_value != 'Yes':
-                log(u"⏭️  Skipping '{0}' tab (H1 = {1})".format(sheet_name, h1_value))
-                continue
+                # Skip Splash Screen / helper tabs by name, before touching any cells
+                if _is_skipped_sheet(sheet_name):
+                    log(u"⏭️  Skipping '{0}' tab".format(sheet_name))
+                    continue
 
-            # Read J3 cell content
-            j3_range = ws.GetType().InvokeMember("Range",
-                                                 System.Reflection.BindingFlags.GetProperty,
-                                                 None, ws, Array[object](["J3"]))
-            j3_value = j3_range.GetType().InvokeMember("Value2",
-                                                       System.Reflection.BindingFlags.GetProperty,
-                                                       None, j3_range, None)
-            if j3_value:
-                worksheets_data.append({
-                    'title': sheet_name,
-                    'content': unicode(j3_value)
-                })
-                log(u"✅  Added '{0}' tab for processing".format(sheet_name))
-            else:
-                log(u"⚠️  '{0}' tab has empty J3 cell".format(sheet_name))
+                # Read H1:J3 in one round-trip (1-based object[,]: H1 = [1,1], J3 = [3,3])
+                block_range = ws.Range["H1:J3"]
+                block = block_range.Value2
+
+                _add_worksheet(worksheets_data, sheet_name,
+                               _block_value(block, 1, 1), _block_value(block, 3, 3))
+            finally:
+                # Release per-sheet wrappers now rather than at GC time
+                _release_com(block_range)
+                _release_com(ws)
 
     except Exception as ex:
         log(u"❌  Excel read error: {0}".format(ex))
     finally:
         # Clean up COM objects
+        _release_com(worksheets)
+        _release_com(workbooks)
         try:
             if wb is not None:
-                wb.GetType().InvokeMember("Close",
-                                          System.Reflection.BindingFlags.InvokeMethod,
-                                          None, wb, Array[object]([False]))
-                Marshal.ReleaseComObject(wb)
+                wb.Close(False)
+        except:
+            pass
+        _release_com(wb, final=True)
+        try:
             if app is not None:
-                app.GetType().InvokeMember("Quit",
-                                           System.Reflection.BindingFlags.InvokeMethod,
-                                           None, app, None)
-                Marshal.ReleaseComObject(app)
+                app.Quit()
         except:
             pass
+        _release_com(app, final=True)
+
+        # Let the RCW finalizers run so the Excel process can exit
+        GC.Collect()
+        GC.WaitForPendingFinalizers()
 
     return worksheets_data
 
@@ -154,6 +414,10 @@ COLUMN_WIDTH = 0.37  # Width of each column
 PAGE_HEIGHT = START_Y - BOTTOM_Y  # Calculate page height from coordinates
 TEXT_WIDTH = 0.3  # Width constraint for text notes
 
+# Default TextNoteType names (title / content)
+TITLE_TYPE_NAME = 'EWP_3.5mm Arrow Masking'
+CONTENT_TYPE_NAME = 'EWP_2.5mm Arrow'
+
 # Abbreviations section fixed coordinates
 ABBREV_X = 11.181472982
 ABBREV_Y = 4.4015
@@ -168,6 +432,7 @@ clr.AddReference('System.Drawing')
 from Autodesk.Revit.DB import (
     TextNote,
     Transaction,
+    TransactionGroup,
     XYZ,
     TextNoteOptions,
     FilteredElementCollector,
@@ -222,23 +487,25 @@ def prompt_for_excel_file():
         return None
 
 
-def delete_all_textnotes(doc):
-    """Delete all TextNotes from the current view."""
+def delete_all_textnotes(doc, view_id):
+    """Delete all TextNotes from the view *view_id*."""
     try:
-        # Get all TextNotes in the current view
-        text_notes = FilteredElementCollector(doc, doc.ActiveView.Id) \
+        # Get the ids of all TextNotes in the current view (no element wrappers)
+        note_ids = FilteredElementCollector(doc, view_id) \
             .OfClass(TextNote) \
-            .ToElements()
+            .ToElementIds()
 
         deleted_count = 0
-        if text_notes:
-            log(u"🗑️  Found {0} existing TextNotes to delete".format(len(text_notes)))
-            for note in text_notes:
-                doc.Delete(note.Id)
-                deleted_count += 1
+        if note_ids.Count:
+            if DEBUG:
+                log(u"🗑️  Found {0} existing TextNotes to delete".format(note_ids.Count))
+            # One Delete call for the whole set instead of one per note
+            deleted_count = note_ids.Count
+            doc.Delete(note_ids)
             log(u"✅  Deleted {0} existing TextNotes".format(deleted_count))
         else:
-            log(u"ℹ️  No existing TextNotes found to delete")
+            if DEBUG:
+                log(u"ℹ️  No existing TextNotes found to delete")
 
         return deleted_count
 
@@ -247,8 +514,26 @@ def delete_all_textnotes(doc):
         return 0
 
 
-def select_text_note_type(available_types, type_purpose):
-    """Show a dialog to let user select a text note type."""
+# CLR classes whose .Name getter raised – go straight to SYMBOL_NAME_PARAM for them
+_NAME_UNSUPPORTED = set()
+
+
+def _type_name(text_note_type):
+    """Return the type's name: .Name, else SYMBOL_NAME_PARAM, else a placeholder."""
+    cls = type(text_note_type)
+    if cls not in _NAME_UNSUPPORTED:
+        try:
+            return text_note_type.Name
+        except AttributeError:
+            _NAME_UNSUPPORTED.add(cls)
+    param = text_note_type.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM)
+    if param:
+        return param.AsString()
+    return u"<Unnamed TextNoteType>"
+
+
+def select_text_note_type(available_types, type_names, type_purpose):
+    """Show a dialog to let user select a text note type (*type_names* parallel to *available_types*)."""
     try:
         # Create form
         form = Form()
@@ -268,19 +553,7 @@ def select_text_note_type(available_types, type_purpose):
         combo.Size = Size(415, 25)
         combo.DropDownStyle = ComboBoxStyle.DropDownList
 
-        # Populate combo box with type names
-        type_names = []
-        for t in available_types:
-            try:
-                name = t.Name
-            except AttributeError:
-                param = t.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM)
-                if param:
-                    name = param.AsString()
-                else:
-                    name = u"<Unnamed TextNoteType>"
-            type_names.append(name)
-
+        # Populate combo box with the already-resolved type names
         for name in type_names:
             combo.Items.Add(name)
 
@@ -313,11 +586,8 @@ def select_text_note_type(available_types, type_purpose):
         result = form.ShowDialog()
 
         if result == WinFormsDialogResult.OK and combo.SelectedIndex >= 0:
-            selected_name = combo.SelectedItem.ToString()
-            # Find the corresponding TextNoteType
-            for i, t in enumerate(available_types):
-                if type_names[i] == selected_name:
-                    return t
+            # Items were added in available_types order, so the index maps straight back
+            return available_types[combo.SelectedIndex]
 
         return None
 
@@ -326,8 +596,23 @@ def select_text_note_type(available_types, type_purpose):
         return None
 
 
-def calculate_text_note_height(text_note_type, text_content, text_width):
-    """Calculate the height of a TextNote based on its type and content, processing paragraph by paragraph."""
+# TextNoteType id → (min, max) allowed TextNote width
+_WIDTH_LIMITS_CACHE = {}
+
+
+def _clamped_text_width(doc, type_id):
+    """Return (width, min, max): TEXT_WIDTH clamped to the type's allowed range."""
+    limits = _WIDTH_LIMITS_CACHE.get(type_id.IntegerValue)
+    if limits is None:
+        limits = (TextNote.GetMinimumAllowedWidth(doc, type_id),
+                  TextNote.GetMaximumAllowedWidth(doc, type_id))
+        _WIDTH_LIMITS_CACHE[type_id.IntegerValue] = limits
+    min_width, max_width = limits
+    return max(min_width, min(TEXT_WIDTH, max_width)), min_width, max_width
+
+
+def _compute_type_metrics(text_note_type, text_width):
+    """Return (line_height, chars_per_line) estimated from the TextNoteType's text size."""
     # Cannot simply be extracted from the TextNote because that information is not available until the transaction is committed. Therefore we need to estimate it based on the TextNoteType parameters and the content.
     try:
         # Get text size from the TextNoteType
@@ -335,49 +620,43 @@ def calculate_text_note_height(text_note_type, text_content, text_width):
         if text_size_param:
             text_size = text_size_param.AsDouble()
         else:
-            log(u"⚠️  No TEXT_SIZE parameter found for TextNoteType '{0}'".format(text_note_type.Name))
+            log(u"⚠️  No TEXT_SIZE parameter found for TextNoteType '{0}'".format(_type_name(text_note_type)))
             text_size = 0.1  # fallback text size
+    except Exception as ex:
+        log(u"⚠️  Error reading TextNoteType text size: {0}".format(ex))
+        text_size = 0.1
 
-        # Estimate line height including spacing
-        line_height = text_size * 1.6
-
-        # Estimated width of each character
-        avg_char_width = text_size * 0.55
+    # Estimate line height including spacing
+    line_height = text_size * 1.6
 
-        # Calculate approximate characters per line
-        chars_per_line = max(1, int(text_width / avg_char_width))
+    # Estimated width of each character
+    avg_char_width = text_size * 0.55
 
-        # Split text into paragraphs
-        if text_content:
-            paragraphs = text_content.split('\n')
-        else:
-            paragraphs = ['']
+    # Calculate approximate characters per line
+    chars_per_line = max(1, int(text_width / avg_char_width))
 
-        total_lines = 0
+    if DEBUG:
+        log(u"📏  Line height: {0}, Chars per line: {1}".format(line_height, chars_per_line))
 
-        # Calculate lines for each paragraph
-        for paragraph in paragraphs:
-            if paragraph.strip():  # Non-empty paragraph
-                paragraph_length = len(paragraph.strip())
-                paragraph_lines = max(1, (paragraph_length + chars_per_line - 1) // chars_per_line)
-                total_lines += paragraph_lines
-                # log(u"📏  Paragraph '{0}...' length: {1}, lines: {2}".format(
-                #     paragraph[:20], paragraph_length, paragraph_lines))
-            else:  # Empty paragraph (line break)
-                total_lines += 1
-                # log(u"📏  Empty paragraph (line break): 1 line")
+    return line_height, chars_per_line
 
-        # Calculate total height
-        total_height = total_lines * line_height
 
-        # log(u"📏  Text size: {0}, Line height: {1}, Chars per line: {2}, Total lines: {3}, Total height: {4}".format(
-        #     text_size, line_height, chars_per_line, total_lines, total_height))
+def _lines_for_content(content, chars_per_line):
+    """Estimate the wrapped line count of *content*, paragraph by paragraph."""
+    if not content:
+        return 1
+    if '\n' not in content:  # titles: a single paragraph, no split needed
+        return -(-len(content.strip()) // chars_per_line) or 1
+    # Lines per paragraph: ceil(len / chars_per_line); an empty paragraph (line break) is 1 line
+    return sum(-(-len(paragraph.strip()) // chars_per_line) or 1
+               for paragraph in content.split('\n'))
 
-        return total_height
 
-    except Exception as ex:
-        log(u"⚠️  Error calculating TextNote height: {0}".format(ex))
-        return 0.2  # fallback height
+def _clear_failures_after_rollback(transaction):
+    """Discard pending failure messages when *transaction* is rolled back (no modal failure dialog)."""
+    options = transaction.GetFailureHandlingOptions()
+    options.SetClearAfterRollback(True)
+    transaction.SetFailureHandlingOptions(options)
 
 
 def check_text_note_fits(current_y, text_height, bottom_boundary):
@@ -387,9 +666,9 @@ def check_text_note_fits(current_y, text_height, bottom_boundary):
 
 def is_abbreviations_section(title):
     """Check if a section is an abbreviations section based on title."""
-    abbrev_keywords = ['abbreviation', 'abbrev', 'acronym']
+    # 'abbrev' also covers 'abbreviation'
     title_lower = title.lower()
-    return any(keyword in title_lower for keyword in abbrev_keywords)
+    return 'abbrev' in title_lower or 'acronym' in title_lower
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -402,86 +681,113 @@ doc = uidoc.Document
 # Find Excel file
 EXCEL_PATH = find_excel_file(doc)
 if not EXCEL_PATH:
+    flush_log()
     TaskDialog.Show("Error", "No Excel file selected. Script will exit.")
     sys.exit()
 
 # Read Excel data
 worksheets_data = read_excel_worksheets(EXCEL_PATH)
 if not worksheets_data:
+    flush_log()
     TaskDialog.Show("No Data", "No valid worksheets found to process.")
     sys.exit()
 
-tx = Transaction(doc, "Create TextNotes from Excel")
+# Delete and create run as two transactions, assimilated into one undo entry
+tg = TransactionGroup(doc, "Create TextNotes from Excel")
+tg.Start()
+tx = Transaction(doc, "Delete existing TextNotes")
+_clear_failures_after_rollback(tx)
 tx.Start()
 
+# Target view, read once for the delete and every TextNote.Create
+view_id = doc.ActiveView.Id
+
 try:
     # Delete all existing TextNotes first
-    delete_all_textnotes(doc)
+    delete_all_textnotes(doc, view_id)
+    tx.Commit()
 
-    # Get text note types (styles)
-    title_type = None
-    content_type = None
+    tx = Transaction(doc, "Create TextNotes")
+    _clear_failures_after_rollback(tx)
+    tx.Start()
 
+    # Get text note types (styles)
     text_note_types = FilteredElementCollector(doc) \
         .OfClass(TextNoteType) \
+        .WhereElementIsElementType() \
         .ToElements()
 
     log(u"📋  Found {0} text note types".format(len(text_note_types)))
 
-    # Debug: list all available text note types safely
-    log(u"📋  Available text note types:")
+    # Index types by name in one pass (debug: list them safely)
+    if DEBUG:
+        log(u"📋  Available text note types:")
+    types_by_name = {}
+    type_names = []  # in collector order, reused by the picker dialog
     for t in text_note_types:
-        # Try .Name, fallback to SYMBOL_NAME_PARAM, else placeholder
-        try:
-            name = t.Name
-        except AttributeError:
-            param = t.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM)
-            if param:
-                name = param.AsString()
-            else:
-                name = u"<Unnamed TextNoteType>"
+        name = _type_name(t)
+        type_names.append(name)
+
+        if DEBUG:
+            log(u"   - {0}".format(name))
+
+        types_by_name[name] = t
 
-        # log(u"   - {0}".format(name))
+        # Both defaults found – stop reading .Name (the debug listing wants every type)
+        if not DEBUG and TITLE_TYPE_NAME in types_by_name and CONTENT_TYPE_NAME in types_by_name:
+            break
 
-        # Match by that name
-        if name == 'EWP_3.5mm Arrow Masking':
-            title_type = t
-        elif name == 'EWP_2.5mm Arrow':
-            content_type = t
+    # Match by name
+    title_type = types_by_name.get(TITLE_TYPE_NAME)
+    content_type = types_by_name.get(CONTENT_TYPE_NAME)
 
     # If types not found, prompt user to select
     if not title_type:
-        log(u"⚠️  'EWP_3.5mm Arrow' not found. Prompting user to select title type.")
-        title_type = select_text_note_type(text_note_types, "Title")
+        log(u"⚠️  '{0}' not found. Prompting user to select title type.".format(TITLE_TYPE_NAME))
+        title_type = select_text_note_type(text_note_types, type_names, "Title")
         if not title_type:
             log(u"❌  No title type selected.")
             tx.RollBack()
+            tg.RollBack()
+            flush_log()
             TaskDialog.Show("Error", "No title text note type selected.")
             sys.exit()
 
     if not content_type:
-        log(u"⚠️  'EWP_2.5mm Arrow' not found. Prompting user to select content type.")
-        content_type = select_text_note_type(text_note_types, "Content")
+        log(u"⚠️  '{0}' not found. Prompting user to select content type.".format(CONTENT_TYPE_NAME))
+        content_type = select_text_note_type(text_note_types, type_names, "Content")
         if not content_type:
             log(u"❌  No content type selected.")
             tx.RollBack()
+            tg.RollBack()
+            flush_log()
             TaskDialog.Show("Error", "No content text note type selected.")
             sys.exit()
 
+    # Loop invariants: type ids and one reusable options object per type
+    title_type_id = title_type.Id
+    content_type_id = content_type.Id
+
+    title_options = TextNoteOptions()
+    title_options.TypeId = title_type_id
+    content_options = TextNoteOptions()
+    content_options.TypeId = content_type_id
+
     # Validate and adjust text width for both types
-    title_min_width = TextNote.GetMinimumAllowedWidth(doc, title_type.Id)
-    title_max_width = TextNote.GetMaximumAllowedWidth(doc, title_type.Id)
-    title_width = max(title_min_width, min(TEXT_WIDTH, title_max_width))
+    title_width, title_min_width, title_max_width = _clamped_text_width(doc, title_type_id)
+    content_width, content_min_width, content_max_width = _clamped_text_width(doc, content_type_id)
 
-    content_min_width = TextNote.GetMinimumAllowedWidth(doc, content_type.Id)
-    content_max_width = TextNote.GetMaximumAllowedWidth(doc, content_type.Id)
-    content_width = max(content_min_width, min(TEXT_WIDTH, content_max_width))
+    if DEBUG:
+        log(u"📏  Title width: {0} (min: {1}, max: {2})".format(title_width, title_min_width, title_max_width))
+        log(u"📏  Content width: {0} (min: {1}, max: {2})".format(content_width, content_min_width, content_max_width))
 
-    # log(u"📏  Title width: {0} (min: {1}, max: {2})".format(title_width, title_min_width, title_max_width))
-    # log(u"📏  Content width: {0} (min: {1}, max: {2})".format(content_width, content_min_width, content_max_width))
+    # Height metrics depend only on type and width – compute them once
+    title_line_height, title_chars_per_line = _compute_type_metrics(title_type, title_width)
+    content_line_height, content_chars_per_line = _compute_type_metrics(content_type, content_width)
 
     current_y = START_Y
     current_column = 0
+    current_x = START_X
     created_notes = 0
 
     # Separate abbreviations from regular sections
@@ -489,52 +795,45 @@ try:
     abbreviations_sections = []
 
     for data in worksheets_data:
-        if is_abbreviations_section(data['title']):
-            abbreviations_sections.append(data)
-        else:
-            regular_sections.append(data)
+        (abbreviations_sections if is_abbreviations_section(data['title']) else regular_sections).append(data)
 
     # Process regular sections in columns
     for data in regular_sections:
         # Calculate heights before placing
-        title_height = calculate_text_note_height(title_type, data['title'], title_width)
-        content_height = calculate_text_note_height(content_type, data['content'], content_width)
+        title_height = _lines_for_content(data['title'], title_chars_per_line) * title_line_height
+        content_height = _lines_for_content(data['content'], content_chars_per_line) * content_line_height
 
         # Calculate total height needed for this section
         total_section_height = title_height + SECTION_SPACING + content_height + INTER_SECTION_SPACING
 
         # Check if the entire section would fit, if not move to next column
-        if not check_text_note_fits(current_y, total_section_height, BOTTOM_Y):
+        # (a section taller than the page stays in an empty column rather than skipping it)
+        if current_y != START_Y and not check_text_note_fits(current_y, total_section_height, BOTTOM_Y):
             current_column += 1
+            current_x = START_X + (current_column * COLUMN_WIDTH)
             current_y = START_Y
-            # log(u"📄  Moving to column {0} for section '{1}'".format(current_column + 1, data['title']))
-
-        current_x = START_X + (current_column * COLUMN_WIDTH)
+            if DEBUG:
+                log(u"📄  Moving to column {0} for section '{1}'".format(current_column + 1, data['title']))
 
         # Create title TextNote
-        title_point = XYZ(current_x, current_y, 0)
-        title_options = TextNoteOptions()
-        title_options.TypeId = title_type.Id
-
-        title_note = TextNote.Create(doc, doc.ActiveView.Id, title_point, title_width, data['title'], title_options)
+        title_note = TextNote.Create(doc, view_id, XYZ(current_x, current_y, 0), title_width, data['title'],
+                                     title_options)
         created_notes += 1
 
         # Adjust Y position after title
         current_y -= (title_height + SECTION_SPACING)
-        # log(u"📏  Title '{0}' height: {1}".format(data['title'], title_height))
+        if DEBUG:
+            log(u"📏  Title '{0}' height: {1}".format(data['title'], title_height))
 
         # Create content TextNote
-        content_point = XYZ(current_x, current_y, 0)
-        content_options = TextNoteOptions()
-        content_options.TypeId = content_type.Id
-
-        content_note = TextNote.Create(doc, doc.ActiveView.Id, content_point, content_width, data['content'],
+        content_note = TextNote.Create(doc, view_id, XYZ(current_x, current_y, 0), content_width, data['content'],
                                        content_options)
         created_notes += 1
 
         # Adjust Y position for next section
         current_y -= (content_height + INTER_SECTION_SPACING)
-        # log(u"📏  Content height: {0}".format(content_height))
+        if DEBUG:
+            log(u"📏  Content height: {0}".format(content_height))
 
         log(u"📝  Created notes for '{0}' at X: {1} Y: {2}".format(data['title'], current_x, current_y))
 
@@ -542,26 +841,19 @@ try:
     abbrev_y = ABBREV_Y
     for data in abbreviations_sections:
         # Calculate heights for abbreviations
-        title_height = calculate_text_note_height(title_type, data['title'], title_width)
-        content_height = calculate_text_note_height(content_type, data['content'], content_width)
+        title_height = _lines_for_content(data['title'], title_chars_per_line) * title_line_height
+        content_height = _lines_for_content(data['content'], content_chars_per_line) * content_line_height
 
         # Create title TextNote at fixed position
-        title_point = XYZ(ABBREV_X, abbrev_y, 0)
-        title_options = TextNoteOptions()
-        title_options.TypeId = title_type.Id
-
-        title_note = TextNote.Create(doc, doc.ActiveView.Id, title_point, title_width, data['title'], title_options)
+        title_note = TextNote.Create(doc, view_id, XYZ(ABBREV_X, abbrev_y, 0), title_width, data['title'],
+                                     title_options)
         created_notes += 1
 
         # Adjust Y position after title
         abbrev_y -= (title_height + SECTION_SPACING)
 
         # Create content TextNote
-        content_point = XYZ(ABBREV_X, abbrev_y, 0)
-        content_options = TextNoteOptions()
-        content_options.TypeId = content_type.Id
-
-        content_note = TextNote.Create(doc, doc.ActiveView.Id, content_point, content_width, data['content'],
+        content_note = TextNote.Create(doc, view_id, XYZ(ABBREV_X, abbrev_y, 0), content_width, data['content'],
                                        content_options)
         created_notes += 1
 
@@ -571,8 +863,10 @@ try:
         log(u"📝  Created abbreviations '{0}' at fixed position X: {1} Y: {2}".format(data['title'], ABBREV_X, abbrev_y))
 
     tx.Commit()
+    tg.Assimilate()
     log(u"✅  Done. Created {0} TextNotes ({1} regular, {2} abbreviations).".format(
         created_notes, len(regular_sections) * 2, len(abbreviations_sections) * 2))
+    flush_log()
     TaskDialog.Show(
         "Finished",
         u"Created {0} TextNotes from {1} Excel tabs ({2} regular sections, {3} abbreviations sections).".format(
@@ -580,8 +874,10 @@ try:
     )
 
 except Exception as ex:
-    # Roll back the transaction
-    tx.RollBack()
+    # Roll back the open transaction and the whole group
+    if tx.HasStarted() and not tx.HasEnded():
+        tx.RollBack()
+    tg.RollBack()
 
     # Get full traceback
     import traceback
@@ -589,6 +885,7 @@ except Exception as ex:
     tb = traceback.format_exc()
 
     log(u"❌  Error creating TextNotes: {0}".format(tb))
+    flush_log()
 
     # Show full traceback in a dialog
     TaskDialog.Show(
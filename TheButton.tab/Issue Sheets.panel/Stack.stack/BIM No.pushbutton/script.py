@@ -19,12 +19,13 @@ Ensure each sheet has "Appears In Sheet List" enabled.
 Author: AO"""
 
 import os
-import shutil
 import clr
 import re
 import sys
 import datetime
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from System import Array, Object
+from System.IO import File
 from System.Runtime.InteropServices import Marshal
 
 # Add necessary .NET and Revit references
@@ -39,7 +40,8 @@ from System.Windows.Forms import SaveFileDialog, DialogResult
 from Autodesk.Revit.DB import (
     FilteredElementCollector, BuiltInCategory,
     ViewSheet, RevisionCloud, Revision,
-    RevisionNumberType
+    RevisionNumberType, BuiltInParameter, ElementId, Viewport,
+    ElementParameterFilter, ParameterFilterRuleFactory
 )
 from Autodesk.Revit.UI import TaskDialog
 
@@ -63,14 +65,39 @@ def get_rev_number(revision, sheet=None):
     return revision.SequenceNumber
 
 
-def excel_col_name(n):
-    """Convert zero-based index to Excel column name (A, B, …, AA, AB, …)."""
-    name = ''
-    while n >= 0:
-        n, r = divmod(n, 26)
-        name = chr(65 + r) + name
-        n -= 1
-    return name
+def param_values(element, names):
+    """Return the stripped values of the named string parameters that are set."""
+    parts = []
+    for name in names:
+        param = element.LookupParameter(name)
+        if param:
+            value = param.AsString()
+            if value:
+                parts.append(value.strip())
+    return parts
+
+
+def release_com(obj):
+    """Release a COM wrapper now instead of leaving it to the finalizer."""
+    try:
+        Marshal.ReleaseComObject(obj)
+    except Exception:
+        pass
+
+
+def write_block(ws, row, col, values):
+    """Assign an object[,] block with its top-left cell at (row, col), 1-based.
+
+    The range is bounded by two integer-indexed cells, so Excel never has to
+    parse an A1 address; every intermediate Range is released.
+    """
+    cells = ws.Cells
+    first = cells[row, col]
+    last = cells[row + values.GetLength(0) - 1, col + values.GetLength(1) - 1]
+    rng = ws.Range[first, last]
+    rng.Value2 = values
+    for obj in (rng, last, first, cells):
+        release_com(obj)
 
 
 def save_file_dialog(init_dir):
@@ -90,21 +117,42 @@ def save_file_dialog(init_dir):
 uidoc = __revit__.ActiveUIDocument
 doc = uidoc.Document
 
+# -- Project part of the drawing number (same for every sheet) --
+project_parts = param_values(doc.ProjectInformation, [
+    'EWP_Project_BIM Number',
+    'EWP_Project_Originator Code',
+    'EWP_Project_Role Code'
+])
+
 # -- Collect all sheets and revision elements --
+# "Appears In Sheet List" (SHEET_SCHEDULED) is filtered natively by the collector
+in_sheet_list = ElementParameterFilter(
+    ParameterFilterRuleFactory.CreateEqualsRule(ElementId(BuiltInParameter.SHEET_SCHEDULED), 1)
+)
 all_sheets = sorted(
     FilteredElementCollector(doc)
         .OfCategory(BuiltInCategory.OST_Sheets)
         .WhereElementIsNotElementType()
+        .WherePasses(in_sheet_list)
         .ToElements(),
     key=lambda s: s.SheetNumber
 )
 all_clouds = FilteredElementCollector(doc) \
-    .OfCategory(BuiltInCategory.OST_RevisionClouds) \
-    .WhereElementIsNotElementType() \
+    .OfClass(RevisionCloud) \
     .ToElements()
+
+# Revision clouds grouped by the view that owns them
+clouds_by_view = defaultdict(list)
+for c in all_clouds:
+    clouds_by_view[c.OwnerViewId].append(c)
+
+# Views placed on each sheet, from one Viewport collector
+views_by_sheet = defaultdict(list)
+for vp in FilteredElementCollector(doc).OfClass(Viewport):
+    views_by_sheet[vp.SheetId].append(vp.ViewId)
+
 all_revisions = FilteredElementCollector(doc) \
-    .OfCategory(BuiltInCategory.OST_Revisions) \
-    .WhereElementIsNotElementType() \
+    .OfClass(Revision) \
     .ToElements()
 
 # -- Gather revision metadata --
@@ -122,27 +170,51 @@ for rev in all_revisions:
     rev_data.append((num, d, rev.Description))
 rev_data.sort(key=lambda x: x[0])
 
+# Revision number → position in rev_data (first match, like the old scan)
+rev_col = {}
+for j, (n, _d, _c) in enumerate(rev_data):
+    rev_col.setdefault(n, j)
+
+# -- Numbering sequence settings, read once per sequence --
+seq_settings_cache = {}
+
+
+def get_seq_settings(seq_id):
+    """Return (prefix, suffix, start, min_digits) of a numeric sequence, or None."""
+    if seq_id not in seq_settings_cache:
+        seq = doc.GetElement(seq_id)
+        settings = None
+        if seq and seq.NumberType == RevisionNumberType.Numeric:
+            numeric = seq.GetNumericRevisionSettings()
+            settings = (numeric.Prefix or '', numeric.Suffix or '',
+                        numeric.StartNumber, numeric.MinimumDigits)
+        seq_settings_cache[seq_id] = settings
+    return seq_settings_cache[seq_id]
+
 # -- Class to represent a sheet with its revisions --
 class RevisedSheet(object):
     def __init__(self, sheet):
         self._sheet = sheet
         self._clouds = []
-        self._rev_ids = set()
+        self._rev_ids = []
+        self.seq_groups = OrderedDict()  # numbering sequence id → revisions, in sequence order
         self._find_clouds()
         self._find_revisions()
 
     def _find_clouds(self):
         """Collect all revision clouds visible on the sheet."""
-        view_ids = [self._sheet.Id] + \
-                   [doc.GetElement(vp).ViewId for vp in self._sheet.GetAllViewports()]
-        for c in all_clouds:
-            if c.OwnerViewId in view_ids:
-                self._clouds.append(c)
+        view_ids = [self._sheet.Id] + views_by_sheet.get(self._sheet.Id, [])
+        for vid in view_ids:
+            self._clouds.extend(clouds_by_view.get(vid, ()))
 
     def _find_revisions(self):
-        """Collect all revision IDs associated with the sheet."""
-        self._rev_ids.update(c.RevisionId for c in self._clouds)
-        self._rev_ids.update(self._sheet.GetAdditionalRevisionIds())
+        """Collect all revision IDs associated with the sheet, in sequence order."""
+        rev_ids = set(c.RevisionId for c in self._clouds)
+        rev_ids.update(self._sheet.GetAdditionalRevisionIds())
+        revs = sorted((doc.GetElement(rid) for rid in rev_ids), key=lambda r: r.SequenceNumber)
+        self._rev_ids = [r.Id for r in revs]
+        for rev in revs:
+            self.seq_groups.setdefault(rev.RevisionNumberingSequenceId, []).append(rev)
 
     @property
     def sheet_number(self):
@@ -158,44 +230,26 @@ class RevisedSheet(object):
 
     def get_drawing_number(self):
         """Construct drawing number from project and sheet parameters."""
-        proj_info = doc.ProjectInformation
-        proj_fields = [
-            'EWP_Project_BIM Number',
-            'EWP_Project_Originator Code',
-            'EWP_Project_Role Code'
-        ]
-        parts = []
-        for name in proj_fields:
-            param = proj_info.LookupParameter(name)
-            if param:
-                value = param.AsString()
-                if value:
-                    parts.append(value.strip())
-
         sheet_fields = [
             'EWP_Sheet_Zone Code',
             'EWP_Sheet_Level Code',
             'EWP_Sheet_Type Code',
             'Sheet Number'
         ]
-        for name in sheet_fields:
-            param = self._sheet.LookupParameter(name)
-            if param:
-                value = param.AsString()
-                if value:
-                    parts.append(value.strip())
-
-        return "-".join(parts)
+        return "-".join(project_parts + param_values(self._sheet, sheet_fields))
 
 # -- Filter valid sheets for the revision report --
+# Sheets without viewports, or with no revision on the sheet or its views, are
+# dropped before a RevisedSheet is built for them.
 revised_sheets = []
 for s in all_sheets:
-    p = s.LookupParameter("Appears In Sheet List")
-    if not p or p.AsInteger() != 1:
+    view_ids = views_by_sheet.get(s.Id)
+    if not view_ids:
+        continue
+    if not s.GetAdditionalRevisionIds() and not any(
+            vid in clouds_by_view for vid in [s.Id] + view_ids):
         continue
-    rs = RevisedSheet(s)
-    if s.GetAllViewports() and rs.rev_count > 0:
-        revised_sheets.append(rs)
+    revised_sheets.append(RevisedSheet(s))
 
 # -- Prepare Excel report --
 template_path = r"I:\BLU - Service Delivery\04 Building Information Management\07 The Button\BIM_No_Issue_Sheets\Document Issue Sheet.xlsx"
@@ -203,7 +257,7 @@ save_path = save_file_dialog(os.path.dirname(template_path))
 if not save_path:
     sys.exit()
 
-shutil.copy(template_path, save_path)
+File.Copy(template_path, save_path, True)  # one native copy, overwrite allowed
 
 # -- Launch Excel and open the copied template --
 excel = Excel.ApplicationClass()
@@ -211,61 +265,72 @@ excel.Visible = False
 excel.DisplayAlerts = False
 wb = excel.Workbooks.Open(save_path)
 
-# -- Fill revision dates in the template --
-for sheet_idx in range(1, wb.Sheets.Count + 1):
-    ws = wb.Sheets.Item[sheet_idx]
+# No recalculation, repaint or events while the blocks are written
+prev_calc = excel.Calculation
+excel.Calculation = Excel.XlCalculation.xlCalculationManual
+excel.ScreenUpdating = False
+excel.EnableEvents = False
+
+# Worksheet wrappers, fetched once and released at teardown
+wb_sheets = wb.Sheets
+sheets = [wb_sheets.Item[i] for i in range(1, wb_sheets.Count + 1)]
+
+# -- Fill revision dates in the template (one D6:x8 block write per worksheet) --
+if rev_data:
+    date_block = Array.CreateInstance(Object, 3, len(rev_data))
     for idx, (_n, date_str, _c) in enumerate(rev_data):
         # Extract digit groups for day, month, year
         nums = re.findall(r'\d+', date_str)
         if len(nums) != 3:
             continue
-        d, m, y = map(int, nums)
-        col = excel_col_name(3 + idx)
-        ws.Range[col + "6"].Value2 = d
-        ws.Range[col + "7"].Value2 = m
-        ws.Range[col + "8"].Value2 = y
+        for k, value in enumerate(map(int, nums)):
+            date_block[k, idx] = value
+    for ws in sheets:
+        write_block(ws, 6, 4, date_block)
 
 # -- Fill sheet data in chunks of 27 rows per sheet --
+# Two block writes per chunk: A:B (drawing number, sheet name) and D:x (one
+# column per revision); column C belongs to the template and is left untouched.
 chunk_size = 27
 for chunk_idx in range(0, len(revised_sheets), chunk_size):
-    ws = wb.Sheets.Item[chunk_idx // chunk_size + 1]
+    ws = sheets[chunk_idx // chunk_size]
     block = revised_sheets[chunk_idx:chunk_idx + chunk_size]
+    names = Array.CreateInstance(Object, len(block), 2)
+    labels = Array.CreateInstance(Object, len(block), len(rev_data))
     for i, rs in enumerate(block):
-        row = 10 + i
-        ws.Range["A{0}".format(row)].Value2 = rs.get_drawing_number()
-        ws.Range["B{0}".format(row)].Value2 = rs.sheet_name
-        revs = [doc.GetElement(rid) for rid in rs._rev_ids]
-        revs.sort(key=lambda r: r.SequenceNumber)
-        seq_groups = OrderedDict()
-        for rev in revs:
-            seq_groups.setdefault(rev.RevisionNumberingSequenceId, []).append(rev)
-        for group in seq_groups.values():
+        names[i, 0] = rs.get_drawing_number()
+        names[i, 1] = rs.sheet_name
+        for seq_id, group in rs.seq_groups.items():
+            settings = get_seq_settings(seq_id)
             for idx, rev in enumerate(group, start=1):
-                seq = doc.GetElement(rev.RevisionNumberingSequenceId)
-                prefix = suffix = ''
-                if seq and seq.NumberType == RevisionNumberType.Numeric:
-                    settings = seq.GetNumericRevisionSettings()
-                    prefix = settings.Prefix or ''
-                    suffix = settings.Suffix or ''
-                    start = settings.StartNumber
-                    min_digits = settings.MinimumDigits
-                    number = start + idx - 1
-                    label = prefix + str(number).zfill(min_digits) + suffix
                 rev_num = get_rev_number(rev)
-                for j, (n, _, _) in enumerate(rev_data):
-                    if n == rev_num:
-                        col = excel_col_name(3 + j)
-                        ws.Range["{0}{1}".format(col, row)].Value2 = label
-                        break
+                if settings:
+                    prefix, suffix, start, min_digits = settings
+                    label = prefix + str(start + idx - 1).zfill(min_digits) + suffix
+                else:
+                    label = rev_num  # alphanumeric sequence: use the revision's own number
+                j = rev_col.get(rev_num)
+                if j is not None:
+                    labels[i, j] = label
+    write_block(ws, 10, 1, names)
+    if rev_data:
+        write_block(ws, 10, 4, labels)
 
 # -- Save, close Excel, and release COM objects --
+# Restore calculation first so the saved workbook holds up-to-date results
+excel.Calculation = prev_calc
+excel.ScreenUpdating = True
+excel.EnableEvents = True
 wb.Save()
 wb.Close(False)
 excel.Quit()
 
 # Release COM objects
-Marshal.ReleaseComObject(wb)
-Marshal.ReleaseComObject(excel)
+for ws in sheets:
+    release_com(ws)
+release_com(wb_sheets)
+Marshal.FinalReleaseComObject(wb)
+Marshal.FinalReleaseComObject(excel)
 wb = None
 excel = None
 
@@ -21,12 +21,12 @@ Make sure every sheet you want to include has the
 Author: AO"""
 
 import os
-import shutil
 import clr
 import re
 import sys
 import datetime
 from collections import OrderedDict
+from System.IO import File
 from System.Runtime.InteropServices import Marshal
 
 # Add necessary .NET and Revit references
@@ -187,7 +187,7 @@ save_path = save_file_dialog(os.path.dirname(template_path))
 if not save_path:
     sys.exit()
 
-shutil.copy(template_path, save_path)
+File.Copy(template_path, save_path, True)  # one native copy, overwrite allowed
 
 # Instantiate Excel using ApplicationClass to avoid abstract interface error
 excel = Excel.ApplicationClass()
@@ -196,10 +196,11 @@ excel.DisplayAlerts = False
 wb = excel.Workbooks.Open(save_path)
 
 # -- Fill revision dates in template --
+# Day / month / year per revision, parsed once rather than once per worksheet
+rev_dmy = [[int(x) for x in re.findall(r'\d+', date_str)] for _n, date_str, _c in rev_data]
 for sheet_idx in range(1, wb.Sheets.Count + 1):
     ws = wb.Sheets.Item[sheet_idx]
-    for idx, (_n, date_str, _c) in enumerate(rev_data):
-        d, m, y = [int(x) for x in re.findall(r'\\d+', date_str)]
+    for idx, (d, m, y) in enumerate(rev_dmy):
         col = excel_col_name(3 + idx)
         ws.Range[col + "6"].Value2 = d
         ws.Range[col + "7"].Value2 = m
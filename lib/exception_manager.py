@@ -26,13 +26,31 @@ Key features
 
 # ───────────────────────────── imports ────────────────────────────────────
 import os
+import io
+import errno
 import json
 import re
 import atexit
 import datetime
 import getpass
+import sys
 from collections import OrderedDict
 
+# Insertion-ordered map: the built-in dict keeps order from CPython 3.7 and is
+# cheaper to fill; IronPython 2.7 falls back to OrderedDict.
+_FastMap = dict if sys.version_info >= (3, 7) else OrderedDict
+
+# Literals are ASCII engineering tokens: keep \b / \d to ASCII semantics.
+# Python 3 needs re.ASCII; 2.7 patterns are ASCII unless re.UNICODE is given.
+_ASCII = getattr(re, 'ASCII', 0)
+
+# “2 No.” style counts → “2No.” / “2No”: plain backreference templates, so the
+# rewrite stays inside the regex engine (no per-match Python callback)
+_COUNT_SUBS = (
+    (re.compile(r'\b([0-9]+)\s*No\.', re.I | _ASCII), r'\1No.'),
+    (re.compile(r'\b([0-9]+)\s*No(?!\.)', re.I | _ASCII), r'\1No'),
+)
+
 # WinForms UI (for error pop-ups)
 from System.Windows.Forms import MessageBox, MessageBoxButtons
 
@@ -44,6 +62,7 @@ SYSTEM_FILE = os.path.join(LIB_DIR, 'system_exceptions.json')
 
 VERSION  = '1.7.2'
 USER     = getpass.getuser()
+JSON_BUFFER = 128 * 1024   # read buffer: exception files are read in one go
 
 # Current RVT model (for logging only – *not* for file rotation)
 doc_path   = __revit__.ActiveUIDocument.Document.PathName   # noqa: F821
@@ -497,26 +516,73 @@ DEFAULT_EXCEPTIONS = {
     ],
 }
 
+# Defaults are constants: freeze them so load_all can share them without copying
+DEFAULT_EXCEPTIONS = {cat: tuple(items) for cat, items in DEFAULT_EXCEPTIONS.items()}
+_DEFAULT_LOWER     = {cat: tuple(x.lower() for x in items)
+                      for cat, items in DEFAULT_EXCEPTIONS.items()}
+
 # ────────────────────────── core helper class ─────────────────────────────
 class ExceptionManager(object):
     """Load / merge default, system and project exception sets."""
-    _cache = None
+    _cache          = None
+    _lower_cache    = None           # lower-cased mirror of _cache, built with it
+    _literal_cache  = None           # (single_map, multi_list) from _classify_all()
+    _regex_cache    = None           # get_single_regexps() result
+    _apply_cache    = None           # (lower_re, literals_re, canon_by_lower, pattern_items)
+    _sys_json_cache = (None, None, None)   # (mtime, parsed SYSTEM_FILE, list categories)
+    _proj_validated = (None, None)   # (path, mtime) of the last project file found valid
+    _version        = 0              # bumped by clear_cache(); lets callers drop derived data
 
     # ------------- public helpers -----------------
     @classmethod
     def clear_cache(cls):
         cls._cache = None
+        cls._lower_cache = None
+        cls._regex_cache = None
+        cls._literal_cache = None
+        cls._apply_cache = None
+        cls._sys_json_cache = (None, None, None)
+        cls._version += 1
+
+    @classmethod
+    def cache_version(cls):
+        """Return a counter that changes every time the cache is cleared."""
+        return cls._version
 
     # ------------- internal IO --------------------
     @classmethod
     def _load_json(cls, path):
         try:
-            with open(path, 'r') as fp:
-                return json.load(fp)
+            with io.open(path, 'rb', buffering=JSON_BUFFER) as fp:
+                raw = fp.read()
+            return json.loads(raw.decode('utf-8'))
         except Exception as exc:
             logger.error("JSON load error (%s): %s", path, exc, extra=LOG_KW)
             return {}
 
+    @classmethod
+    def _system_cache(cls):
+        """Return ``(mtime, data, overrides)`` for *system_exceptions.json*.
+
+        The file is re-read only when its mtime changes. *overrides* holds the
+        ``(category, items)`` pairs whose value is a list, validated once here.
+        """
+        try:
+            mtime = os.path.getmtime(SYSTEM_FILE)
+        except OSError:
+            mtime = None
+        if mtime is None or mtime != cls._sys_json_cache[0]:
+            data = cls._load_json(SYSTEM_FILE)
+            overrides = [(cat, items) for cat, items in data.items()
+                         if isinstance(items, list)]
+            cls._sys_json_cache = (mtime, data, overrides)
+        return cls._sys_json_cache
+
+    @classmethod
+    def _load_system(cls):
+        """Return the parsed *system_exceptions.json*."""
+        return cls._system_cache()[1]
+
     @classmethod
     def _get_project_path(cls):
         """Return <model>_exceptions.json, creating an empty file if missing."""
@@ -532,25 +598,42 @@ class ExceptionManager(object):
                 raise Exception("No folder selected for project exceptions.")
             proj_file = os.path.join(folder, 'project_exceptions.json')
 
+        # Unchanged since it was last validated: nothing to check
+        try:
+            mtime = os.path.getmtime(proj_file)
+        except OSError:
+            mtime = None
+        if mtime is not None and (proj_file, mtime) == cls._proj_validated:
+            return proj_file
+
         # Guarantee the file exists and is a flat list
-        if not os.path.isfile(proj_file):
-            with open(proj_file, 'w') as fp:
-                json.dump([], fp, indent=2)
-        else:
-            try:
-                with open(proj_file, 'r') as fp:
-                    content = json.load(fp)
-                if not isinstance(content, list):
-                    MessageBox.Show(
-                        "The file\n{}\nexists but is not a flat list. "
-                        "Please correct the JSON manually.".format(proj_file),
-                        "Invalid project_exceptions.json",
-                        MessageBoxButtons.OK)
-                    logger.error(
-                        "Invalid project exceptions format – expected list, got %s",
-                        type(content).__name__, extra=LOG_KW)
-            except Exception as exc:
+        try:
+            with io.open(proj_file, 'rb', buffering=JSON_BUFFER) as fp:
+                raw = fp.read()
+        except IOError as exc:
+            if exc.errno == errno.ENOENT:
+                with open(proj_file, 'w') as fp:
+                    json.dump([], fp, indent=2)
+                cls._proj_validated = (proj_file, os.path.getmtime(proj_file))
+            else:
                 logger.error("Error reading project exceptions: %s", exc, extra=LOG_KW)
+            return proj_file
+
+        try:
+            content = json.loads(raw.decode('utf-8'))
+            if not isinstance(content, list):
+                MessageBox.Show(
+                    "The file\n{}\nexists but is not a flat list. "
+                    "Please correct the JSON manually.".format(proj_file),
+                    "Invalid project_exceptions.json",
+                    MessageBoxButtons.OK)
+                logger.error(
+                    "Invalid project exceptions format – expected list, got %s",
+                    type(content).__name__, extra=LOG_KW)
+            else:
+                cls._proj_validated = (proj_file, mtime)
+        except Exception as exc:
+            logger.error("Error reading project exceptions: %s", exc, extra=LOG_KW)
 
         return proj_file
 
@@ -559,40 +642,60 @@ class ExceptionManager(object):
     def load_all(cls):
         """
         Merge default, system and project tiers into
-        ``OrderedDict{category: [items...]}``.
+        an ordered ``{category: [items...]}`` map.
 
         Result is cached; call :py:meth:`clear_cache` to force reload.
         """
         if cls._cache:
             return cls._cache
 
-        merged = OrderedDict()
+        merged = _FastMap()
 
-        # Defaults (tier-1)
+        lowers = {}           # category → lower-cased items, parallel to *merged*
+
+        # Defaults (tier-1) – shared tuples, copied only if a later tier extends them
         for cat, items in DEFAULT_EXCEPTIONS.items():
-            merged[cat] = items[:]
+            merged[cat] = items
+            lowers[cat] = _DEFAULT_LOWER[cat]
 
         # System overrides (tier-2)
-        for cat, items in cls._load_json(SYSTEM_FILE).items():
-            if isinstance(items, list):
-                merged.setdefault(cat, []).extend(items)
+        for cat, items in cls._system_cache()[2]:
+            lst = merged.get(cat, ())
+            if not isinstance(lst, list):
+                lst = merged[cat] = list(lst)
+                lowers[cat] = list(lowers.get(cat, ()))
+            lst.extend(items)
+            lowers[cat].extend(x.lower() for x in items)
 
         # Project overrides (tier-3)
         project_path = cls._get_project_path()
         raw_project  = cls._load_json(project_path)
         project_items = raw_project if isinstance(raw_project, list) else []
 
-        # Remove any lower-case duplicate across tiers, then append project items
-        for phrase in project_items:
-            low = phrase.lower()
-            for lst in merged.values():
-                lst[:] = [x for x in lst if x.lower() != low]
-
-        for cat in merged:                         # de-duplicate per category
+        # One pass per category: drop anything the project tier redefines
+        # (case-insensitively) and de-duplicate what is left
+        project_lower = [p.lower() for p in project_items]
+        project_lows  = frozenset(project_lower)
+        merged_lower  = _FastMap()
+        for cat, lst in merged.items():
             seen = set()
-            merged[cat] = [x for x in merged[cat]
-                           if not (x.lower() in seen or seen.add(x.lower()))]
-
+            out  = []
+            out_lower = []
+            for x, xl in zip(lst, lowers[cat]):
+                if xl in project_lows or xl in seen:
+                    continue
+                seen.add(xl)
+                out.append(x)
+                out_lower.append(xl)
+            merged[cat] = out
+            merged_lower[cat] = out_lower
+
+        # The lower-cased mirror is kept beside _cache rather than in it, so the
+        # shape callers get from load_all() does not change.
+        cls._lower_cache = {
+            'merged' : merged_lower,
+            'project': project_lower
+        }
         cls._cache = {
             'merged' : merged,
             'project': project_items
@@ -601,50 +704,71 @@ class ExceptionManager(object):
 
     # ------------- convenience views ------------
     @classmethod
-    def get_single_literals_map(cls):
-        """Return *{lowercase: canonical}* for all single-word literals."""
-        data = cls.load_all()
-        single = OrderedDict()
+    def _classify_all(cls):
+        """
+        Split the catalogue into ``(single_map, multi_list)`` in one pass.
 
-        # project tier wins ties
-        for phrase in data['project']:
-            if ' ' not in phrase:
-                single[phrase.lower()] = phrase
+        The project tier is walked first and wins ties; the result is cached
+        until :py:meth:`clear_cache`.
+        """
+        if cls._literal_cache is not None:
+            return cls._literal_cache
+
+        data   = cls.load_all()
+        lower  = cls._lower_cache
+        single = _FastMap()
+        multi  = []
+        seen   = set()        # lower-cased phrases already in *multi*
+
+        tiers = [(data['project'], lower['project'], True)]
+        tiers.extend((phrases, lower['merged'][cat], False)
+                     for cat, phrases in data['merged'].items())
+        for phrases, lows, is_project in tiers:
+            for phrase, low in zip(phrases, lows):
+                if ' ' in phrase:
+                    if low not in seen:
+                        seen.add(low)
+                        multi.append(phrase)
+                elif is_project or low not in single:
+                    single[low] = phrase
+
+        # Few distinct lengths: bucket by length instead of a comparison sort;
+        # buckets keep insertion order, like the stable sort they replace.
+        buckets = {}
+        for phrase in multi:
+            buckets.setdefault(len(phrase), []).append(phrase)
+        multi = [phrase for size in sorted(buckets, reverse=True)
+                 for phrase in buckets[size]]
+
+        cls._literal_cache = (single, multi)
+        return cls._literal_cache
 
-        for phrases in data['merged'].values():
-            for phrase in phrases:
-                if ' ' not in phrase and phrase.lower() not in single:
-                    single[phrase.lower()] = phrase
-        return single
+    @classmethod
+    def get_single_literals_map(cls):
+        """Return *{lowercase: canonical}* for all single-word literals (cached, do not mutate)."""
+        return cls._classify_all()[0]
 
     @classmethod
     def get_multi_word_literals(cls):
-        """Return multi-word literals, longest first."""
-        data = cls.load_all()
-        multi = []
-
-        for phrase in data['project']:
-            if ' ' in phrase:
-                multi.append(phrase)
-
-        for phrases in data['merged'].values():
-            for phrase in phrases:
-                if ' ' in phrase and phrase.lower() not in (p.lower() for p in multi):
-                    multi.append(phrase)
-
-        return sorted(multi, key=len, reverse=True)
+        """Return multi-word literals, longest first (cached, do not mutate)."""
+        return cls._classify_all()[1]
 
     @classmethod
     def get_single_regexps(cls):
         """
-        Build an ``OrderedDict{compiled_regex : canonical}`` for fast restoration.
+        Build an ordered ``{compiled_regex : canonical}`` map for fast restoration.
 
         *   **Plain alphanum**   –  ``\\b … \\b`` boundaries
         *   **Special chars**    –  no word boundaries (handles ``M&E``, ``c/c`` …)
         *   **Multi-word**       –  exact phrase, case-insensitive
         *   **Patterns**         –  dotted abbr. & “2No.” style counts
+
+        Result is cached until :py:meth:`clear_cache`.
         """
-        out = OrderedDict()
+        if cls._regex_cache is not None:
+            return cls._regex_cache
+
+        out = _FastMap()
         plain_map  = {}
         special_map = {}
 
@@ -653,7 +777,7 @@ class ExceptionManager(object):
 
         # plain words
         for low, canon in plain_map.items():
-            out[re.compile(r'\b' + re.escape(low) + r'\b', re.I)] = canon
+            out[re.compile(r'\b' + re.escape(low) + r'\b', re.I | _ASCII)] = canon
 
         # words containing &, /, dots, etc.
         for low, canon in special_map.items():
@@ -664,33 +788,91 @@ class ExceptionManager(object):
             out[re.compile(re.escape(phrase), re.I)] = phrase
 
         # special patterns
-        out[re.compile(r'\b(\d+)\s*No\.?', re.I)] = \
-            (lambda m: u'%sNo%s' % (m.group(1), '.' if m.group(0).endswith('.') else ''))
-        out[re.compile(r'\bu\.n\.o\.', re.I)] = 'u.n.o.'
-        out[re.compile(r'\bt\.b\.c\.', re.I)] = 'T.B.C.'
+        for rx, template in _COUNT_SUBS:
+            out[rx] = template
+        out[re.compile(r'\bu\.n\.o\.', re.I | _ASCII)] = 'u.n.o.'
+        out[re.compile(r'\bt\.b\.c\.', re.I | _ASCII)] = 'T.B.C.'
 
+        cls._regex_cache = out
         return out
 
+    @classmethod
+    def _apply_regexps(cls):
+        """Fuse the literal entries of :py:meth:`get_single_regexps` into one regex."""
+        if cls._apply_cache is None:
+            regexps  = cls.get_single_regexps()
+            # Longest canonical first, so the alternation prefers the longest literal
+            count_rx = frozenset(rx for rx, _ in _COUNT_SUBS)
+            literals = sorted([(rx, canon) for rx, canon in regexps.items()
+                               if rx not in count_rx],
+                              key=lambda item: len(item[1]), reverse=True)
+            sources  = ['(?:' + rx.pattern + ')' for rx, _ in literals]
+            # Every literal source is an escaped string, so lower-casing it gives
+            # a case-sensitive pattern for lower-cased text (no re.I folding).
+            lower_re    = re.compile('|'.join(src.lower() for src in sources) or r'(?!)',
+                                     _ASCII)
+            literals_re = re.compile('|'.join(sources) or r'(?!)', re.I | _ASCII)
+            canon_by_lower = {canon.lower(): canon for _, canon in literals}
+            pattern_items  = list(_COUNT_SUBS)
+            cls._apply_cache = (lower_re, literals_re, canon_by_lower, pattern_items)
+        return cls._apply_cache
+
+    @classmethod
+    def apply(cls, text):
+        """
+        Restore every literal in *text* to its canonical form.
+
+        Plain, special-character and multi-word literals are matched by a
+        single alternation in one scan; the count patterns
+        (``2No.``) run afterwards.
+        """
+        lower_re, literals_re, canon_by_lower, pattern_items = cls._apply_regexps()
+        low = text.lower()
+        if len(low) == len(text):
+            # Match on the lower-cased copy, splice canonicals into the original
+            parts, pos = [], 0
+            for m in lower_re.finditer(low):
+                start, end = m.span()
+                parts.append(text[pos:start])
+                parts.append(canon_by_lower.get(m.group(0), text[start:end]))
+                pos = end
+            if parts:
+                parts.append(text[pos:])
+                text = ''.join(parts)
+        else:
+            # Lower-casing changed the length: spans would not line up
+            text = literals_re.sub(
+                lambda m: canon_by_lower.get(m.group(0).lower(), m.group(0)), text)
+        for rx, repl in pattern_items:
+            text = rx.sub(repl, text)
+        return text
+
     # Possessive (apostrophe) terms – stored only in system JSON
     @classmethod
     def load_apostrophe_exceptions(cls):
-        return cls._load_json(SYSTEM_FILE).get("Possessive Terms", {})
+        """Return *{term: possessive}* as a copy; the system data stays cached."""
+        return dict(cls._load_system().get("Possessive Terms", {}))
 
 # ───────────────────── small runtime helper (used elsewhere) ──────────────
 class ExceptionApplier(object):
-    """Utility class used by Change Register to enforce per-token rules."""
+    """Restores the system file's possessive terms in text."""
     def __init__(self):
         self.apostrophe_map = ExceptionManager.load_apostrophe_exceptions()
 
+        # The map is fixed for the applier's lifetime: compile the alternation
+        # once (longest key first) instead of on every call.
+        keys = sorted(self.apostrophe_map.keys(), key=len, reverse=True)
+        self._apos_re = re.compile(
+            r'\b(' + '|'.join(re.escape(k) for k in keys) + r')\b',
+            re.IGNORECASE) if keys else None
+        self._apos_lower = {k.lower(): v for k, v in self.apostrophe_map.items()}
+
     def apply_apostrophe_exceptions(self, text):
-        if not self.apostrophe_map:
+        if self._apos_re is None:
             return text
-        pattern = re.compile(r'\b({})\b'.format('|'.join(map(re.escape,
-                                                            self.apostrophe_map.keys()))),
-                             re.IGNORECASE)
-        return pattern.sub(lambda m: self.apostrophe_map.get(m.group(0).lower(),
-                                                             m.group(0)),
-                           text)
+        return self._apos_re.sub(lambda m: self._apos_lower.get(m.group(0).lower(),
+                                                                m.group(0)),
+                                 text)
 
 # ───────────────────── cache cleanup on pyRevit exit ───────────────────────
 atexit.register(ExceptionManager.clear_cache)
\ No newline at end of file
@@ -6,15 +6,21 @@ Version   : 2.0
 Date      : 2025-05-15
 Author    : AO
 
-A tiny helper that gives each script a **TimedRotatingFileHandler** pointing to
+A tiny helper that gives each script a **RotatingFileHandler** pointing to
 `%APPDATA%\MyPyRevitExtension\logs`.
 Every log entry:
 
 * is UTF-8
 * includes the calling script name in the `src` column
-* rolls over at midnight and keeps 90 days of history
+* goes to one file per month (``_YYYY_MM`` in the name), rolled over only
+  if it passes 50 MB
 * prepends the current project-exceptions JSON path the first time the log
-  file is created.
+  file is created
+* is written by a background thread: callers only enqueue the record, so a
+  slow network share never blocks the Revit UI thread
+* is batched in memory and written every few seconds (errors at once)
+* is filtered at ``BUTTON_LOG_LEVEL`` (env var, default ``INFO``); guard
+  costly message arguments with ``logger.isEnabledFor(level)``.
 
 IronPython 2.7 / Revit 2024 compatible.
 """
@@ -25,7 +31,19 @@ import os
 import logging
 import atexit
 import datetime
-from logging.handlers import TimedRotatingFileHandler
+import threading
+import time
+from logging.handlers import MemoryHandler, RotatingFileHandler
+
+try:
+    import queue as _queue_mod                      # Python 3
+except ImportError:
+    import Queue as _queue_mod                      # IronPython 2.7
+
+try:
+    from logging.handlers import QueueHandler, QueueListener
+except ImportError:                                 # not in the 2.7 stdlib
+    QueueHandler = QueueListener = None
 
 # -----------------------------------------------------------------------------
 # Constants
@@ -34,6 +52,28 @@ APPDATA  = os.environ.get('APPDATA', '')
 LOG_DIR  = r"I:\BLU - Service Delivery\04 Building Information Management\07 The Button\logs"
 VERSION  = '2.0'
 
+# Records held per log file before one batched write (env BUTTON_LOG_BUFFER)
+try:
+    LOG_BUFFER = max(1, int(os.environ.get('BUTTON_LOG_BUFFER', 512)))
+except ValueError:
+    LOG_BUFFER = 512
+LOG_FLUSH_INTERVAL = 2.0     # seconds; bounds how long a record may sit in memory
+LOG_MAX_BYTES      = 50 * 1024 * 1024   # size safety net; files are monthly anyway
+LOG_WRITE_BUFFER   = 64 * 1024          # file buffer: one write to the share per flush
+
+# INFO stays the default: the Case Manager tools log every edit at INFO as
+# their audit trail. Set BUTTON_LOG_LEVEL=WARNING to skip those records.
+LOG_LEVEL = getattr(logging, os.environ.get('BUTTON_LOG_LEVEL', 'INFO').upper(), logging.INFO)
+if not isinstance(LOG_LEVEL, int):
+    LOG_LEVEL = logging.INFO
+
+_FMT = '%(asctime)s [v{0}] %(src)-14s %(levelname)s: %(message)s'.format(VERSION)
+
+# Close every handler at exit – registered once, here, not per get_logger().
+# atexit runs last-in first-out, so the listener's _shutdown (registered on
+# first use) drains the queue before this closes the files.
+atexit.register(logging.shutdown)
+
 # Ensure log directory exists
 if not os.path.isdir(LOG_DIR):
     try:
@@ -44,17 +84,263 @@ if not os.path.isdir(LOG_DIR):
 # -----------------------------------------------------------------------------
 # Helper classes / functions
 # -----------------------------------------------------------------------------
-class _SrcFilter(logging.Filter):
-    """Inject a default `src` attribute if the record does not have one."""
+if QueueHandler is None:
+    class QueueHandler(logging.Handler):
+        """Minimal 2.7 stand-in: enqueue records, message rendered by the caller."""
+
+        def __init__(self, queue):
+            logging.Handler.__init__(self)
+            self.queue = queue
+
+        def prepare(self, record):
+            # Render args / traceback now so the writer thread never touches
+            # caller objects (Revit API elements must stay on the UI thread).
+            msg = self.format(record)
+            record.message = msg
+            record.msg = msg
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+            return record
+
+        def emit(self, record):
+            try:
+                self.queue.put_nowait(self.prepare(record))
+            except Exception:
+                self.handleError(record)
+
+    class QueueListener(object):
+        """Minimal 2.7 stand-in: hand queued records to *handlers* on a thread."""
+        _sentinel = None
+
+        def __init__(self, queue, *handlers, **kwargs):
+            self.queue = queue
+            self.handlers = handlers
+            self.respect_handler_level = kwargs.get('respect_handler_level', False)
+            self._thread = None
+
+        def start(self):
+            self._thread = threading.Thread(target=self._monitor)
+            self._thread.daemon = True
+            self._thread.start()
+
+        def handle(self, record):
+            for handler in self.handlers:
+                if not self.respect_handler_level or record.levelno >= handler.level:
+                    handler.handle(record)
+
+        def _monitor(self):
+            while True:
+                record = self.queue.get()
+                if record is self._sentinel:
+                    break
+                self.handle(record)
+
+        def stop(self):
+            self.queue.put_nowait(self._sentinel)
+            self._thread.join()
+            self._thread = None
+
+
+# One queue and one writer thread shared by every logger of the extension
+_queue         = _queue_mod.Queue(-1)
+_listener      = None
+_listener_lock = threading.Lock()
+_buffers       = []          # MemoryHandlers fed by the listener
+_flusher       = None        # single thread writing the buffers out periodically
+_flush_stop    = threading.Event()
+
+
+def _flush_buffers():
+    """Push every buffered record to its file and the file buffer to disk."""
+    for buf in list(_buffers):
+        buf.flush()
+        buf.target.flush()
+
+
+def _flush_loop():
+    """Flush the buffers every LOG_FLUSH_INTERVAL seconds until stopped."""
+    while not _flush_stop.wait(LOG_FLUSH_INTERVAL):
+        _flush_buffers()
 
-    def __init__(self, default_src):
-        super(_SrcFilter, self).__init__()
-        self.default_src = default_src
 
-    def filter(self, record):
-        if not hasattr(record, 'src'):
-            record.src = self.default_src
-        return True
+def _shutdown():
+    """Stop the flusher, drain the queue, then write what is buffered
+    (before logging.shutdown)."""
+    if _flush_stop.is_set():
+        return                               # already shut down
+    _flush_stop.set()
+    _flusher.join()
+    _listener.stop()
+    _flush_buffers()
+
+
+def _attach_handler(handler):
+    """Add *handler* to the shared listener, starting it on first use."""
+    global _listener, _flusher
+    with _listener_lock:
+        _buffers.append(handler)
+        if _listener is None:
+            _listener = QueueListener(_queue, handler, respect_handler_level=True)
+            _listener.start()
+            _flusher = threading.Thread(target=_flush_loop)
+            _flusher.daemon = True
+            _flusher.start()
+            # Runs before logging's own exit hook closes the files
+            atexit.register(_shutdown)
+        else:
+            _listener.handlers = _listener.handlers + (handler,)
+
+
+class _LogFileHandler(RotatingFileHandler):
+    """Rotating handler that writes each record as pre-encoded bytes.
+
+    Log lines are almost always ASCII, so they are encoded with the cheap
+    ASCII codec and only fall back to UTF-8 when needed; the line is
+    formatted once (the stock size check formats it a second time).
+
+    The file is opened with a large buffer and only flushed for ERROR
+    records; everything else reaches disk on the periodic flush. The size
+    for rollover is tracked in a byte counter: seeking the stream per
+    record would flush its buffer every line.
+    """
+
+    def _open(self):
+        stream = open(self.baseFilename, 'ab', LOG_WRITE_BUFFER)
+        stream.seek(0, 2)                     # 2.7 reports 0 until the first seek
+        self._size = stream.tell()
+        return stream
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+            try:
+                data = msg.encode('ascii')
+            except UnicodeEncodeError:
+                data = msg.encode('utf-8')
+            data += b'\n'
+
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size + len(data) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:               # delay=True leaves it closed
+                    self.stream = self._open()        # new file: counter restarts
+            self.stream.write(data)
+            self._size += len(data)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class _HeaderQueueHandler(QueueHandler):
+    """Queue handler that starts a new log file with its header on the first record.
+
+    One exclusive create tells whether this process makes the file; only
+    then is the header resolved, as that may prompt for a folder (unsaved
+    models).
+    """
+
+    def __init__(self, queue, log_path):
+        QueueHandler.__init__(self, queue)
+        self._log_path = log_path
+        self._header_pending = True
+
+    def emit(self, record):
+        if self._header_pending:
+            self._header_pending = False     # exception_manager logs while it is imported
+            _create_with_header(self._log_path)
+        QueueHandler.emit(self, record)
+
+
+def _create_with_header(log_path):
+    """Create *log_path* with the header line unless the file already exists."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    try:
+        fd = os.open(log_path, flags, 0o666)
+    except OSError:
+        return                               # exists already (or share unavailable)
+    try:
+        os.write(fd, _project_header())
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_now          = datetime.datetime.now
+_MODEL_CACHE  = {}           # id(doc) → model name used in log-file names
+_LOGGER_CACHE = {}           # (name, filename_override) → configured logger
+
+
+def _model_name():
+    """Return the active model's file name without extension (or a fallback)."""
+    try:
+        doc = __revit__.ActiveUIDocument.Document            # noqa: F821 (pyRevit)
+    except Exception:
+        return 'unsaved_doc'
+    key = id(doc)
+    model = _MODEL_CACHE.get(key)
+    if model is None:
+        path = doc.PathName
+        if path:
+            # Windows-only code: split on the separators directly (cloud
+            # models use '/'), no os.path round trips
+            base  = path.replace('/', '\\').rsplit('\\', 1)[-1]
+            model = base.rsplit('.', 1)[0] if '.' in base else base
+        else:
+            model = 'unsaved_doc'
+        _MODEL_CACHE[key] = model
+    return model
+
+
+_HEADER_PREFIX = b'project_exceptions_path: '
+
+
+def _project_header():
+    """Return the one-off header line naming the project exceptions JSON, as UTF-8."""
+    try:
+        from exception_manager import ExceptionManager
+        proj = ExceptionManager._get_project_path()
+    except Exception:
+        return b''
+    return _HEADER_PREFIX + proj.encode('utf-8') + b'\n'
+
+
+class _CachedFormatter(logging.Formatter):
+    """Formatter that renders the date/time part once per second."""
+
+    def __init__(self, fmt):
+        logging.Formatter.__init__(self, fmt)
+        self._last_sec = -1
+        self._last_str = ''
+
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_str = time.strftime('%Y-%m-%d %H:%M:%S', self.converter(record.created))
+            self._last_sec = sec
+        return '%s,%03d' % (self._last_str, record.msecs)
+
+
+def _bind_src(logger, default_src):
+    """Give records of *logger* a default `src` while they are built.
+
+    Wraps the instance's ``makeRecord`` instead of adding a filter, so no
+    filter chain runs per record; an explicit ``extra={'src': ...}`` wins.
+    """
+    make_record = logger.makeRecord
+
+    def makeRecord(name, level, fn, lno, msg, args, exc_info,
+                   func=None, extra=None, *rest, **kwargs):
+        record = make_record(name, level, fn, lno, msg, args, exc_info,
+                             func, extra, *rest, **kwargs)
+        if extra is None or 'src' not in extra:
+            record.src = default_src
+        return record
+
+    logger.makeRecord = makeRecord
 
 
 def get_logger(name, filename_override=None):
@@ -64,59 +350,50 @@ def get_logger(name, filename_override=None):
     Multiple calls with the same *name* return the already-configured instance
     (“init-once” behaviour).
     """
+    key = (name, filename_override)
+    cached = _LOGGER_CACHE.get(key)
+    if cached is not None:
+        return cached
+
     logger = logging.getLogger(name)
     if getattr(logger, '_initialized', False):
+        _LOGGER_CACHE[key] = logger
         return logger
 
-    # -----------------------------------------------------------------
-    # Work out a human-readable model name (or fallback)
-    # -----------------------------------------------------------------
-    model = 'unsaved_doc'
-    try:
-        doc  = __revit__.ActiveUIDocument.Document           # noqa: F821 (pyRevit)
-        path = doc.PathName
-        if path:
-            model = os.path.splitext(os.path.basename(path))[0]
-    except Exception:
-        pass
-
     # -----------------------------------------------------------------
     # Build log-file name:  <base>_<model>_v<ver>_<YYYY_MM>.log
     # -----------------------------------------------------------------
-    ym        = datetime.datetime.now().strftime('%Y_%m')
+    ym        = _now().strftime('%Y_%m')    # only reached for a new logger
     base      = filename_override or name
-    log_fname = '{0}_{1}_v{2}_{3}.log'.format(base, model, VERSION, ym)
-    log_path  = os.path.join(LOG_DIR, log_fname)
-
-    # Write a one-off header with the project exception JSON path
-    if not os.path.isfile(log_path):
-        try:
-            from exception_manager import ExceptionManager
-            proj = ExceptionManager._get_project_path()
-            with open(log_path, 'a') as fp:
-                fp.write('project_exceptions_path: {0}\n'.format(proj))
-        except Exception:
-            pass
+    log_fname = '{0}_{1}_v{2}_{3}.log'.format(base, _model_name(), VERSION, ym)
+    log_path  = LOG_DIR + '\\' + log_fname
 
     # -----------------------------------------------------------------
     # Handler / formatter
     # -----------------------------------------------------------------
-    handler = TimedRotatingFileHandler(
-        log_path, when='midnight', interval=1,
-        backupCount=90, encoding='utf-8'
+    # The header (project exceptions path) is written by the logger's queue
+    # handler on the first record, if that record creates the file.
+    handler = _LogFileHandler(
+        log_path, maxBytes=LOG_MAX_BYTES, backupCount=3, delay=True
     )
 
-    fmt = '%(asctime)s [v' + VERSION + '] %(src)-14s %(levelname)s: %(message)s'
-    handler.setFormatter(logging.Formatter(fmt))
+    handler.setFormatter(_CachedFormatter(_FMT))
+
+    # Batch records into one write per flush; ERROR and above go out at once
+    buffered = MemoryHandler(LOG_BUFFER, flushLevel=logging.ERROR, target=handler)
+    # The listener hands every record to every buffer: keep this one to
+    # records of its own logger
+    buffered.addFilter(logging.Filter(name))
 
     # -----------------------------------------------------------------
     # Logger configuration (once only)
     # -----------------------------------------------------------------
-    logger.setLevel(logging.INFO)
-    logger.addHandler(handler)
-    logger.addFilter(_SrcFilter(name))
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(_HeaderQueueHandler(_queue, log_path))
+    _bind_src(logger, name)
     logger.propagate = False     # prevent double-logging to root
 
-    atexit.register(logging.shutdown)
+    _attach_handler(buffered)
     logger._initialized = True
+    _LOGGER_CACHE[key] = logger
     return logger